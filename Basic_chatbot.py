@@ -1,21 +1,264 @@
-import tkinter as tk
-from tkinter import scrolledtext, messagebox
+import time
+_process_start = time.perf_counter()
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import pickle
 import requests
-import spacy
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.naive_bayes import MultinomialNB
 import random
+import re
+import struct
+import sys
+import threading
+from array import array
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from importlib import metadata
+from requests.adapters import HTTPAdapter
+
+# tkinter is only imported when a window is opened (see load_gui), so the
+# engine can also run on headless servers
+tk = scrolledtext = None
+
+def load_gui():
+    """
+    Import tkinter into this module's namespace.
+    """
+    global tk, scrolledtext
+    import tkinter as tk
+    from tkinter import scrolledtext
+
+# Startup and lazy-loading costs in milliseconds, filled in as they happen
+startup_timings = {}
+
+# Typing this in the chat shows the pipeline metrics instead of a reply
+STATS_COMMAND = "/stats"
+# Optional periodic JSON dump of the metrics, and optional cProfile output
+METRICS_FILE = os.environ.get("CHATBOT_METRICS")
+METRICS_INTERVAL = float(os.environ.get("CHATBOT_METRICS_INTERVAL", "60"))
+PROFILE_OUTPUT = os.environ.get("CHATBOT_PROFILE")
+
+class LatencyHistogram:
+    BUCKETS = 32
+
+    def __init__(self):
+        """
+        Initialize a latency histogram with power-of-two microsecond buckets.
+
+        Bucket i counts durations below 2**i microseconds, so recording is
+        one bit_length() and one increment.
+        """
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Add one duration.
+
+        :param seconds: The duration in seconds.
+        """
+        self.counts[min(int(seconds * 1_000_000).bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile from the buckets.
+
+        :param fraction: The percentile as a fraction (0.99 for p99).
+        :return: The upper bound of the bucket holding it, in milliseconds.
+        """
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(2 ** i / 1000, self.max * 1000)
+        return 0.0
+
+    def summary(self):
+        """
+        Summarize the recorded durations.
+
+        :return: A dictionary with the count, mean, percentiles and maximum in milliseconds.
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max * 1000
+        }
+
+class Metrics:
+    def __init__(self):
+        """
+        Initialize per-stage latency histograms and event counters.
+
+        Updates are not locked: under heavy threading an increment can
+        occasionally be lost, which is acceptable for monitoring and keeps
+        the hot path cheap.
+        """
+        self.stages = {}
+        self.counters = Counter()
+        self._dump_stop = None
+
+    def record(self, stage, start):
+        """
+        Record the time a stage took.
+
+        :param stage: Stage name (e.g., "classify").
+        :param start: Value of time.perf_counter() when the stage started.
+        """
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages.setdefault(stage, LatencyHistogram())
+        histogram.record(time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        """
+        Increment an event counter.
+
+        :param name: Counter name (e.g., "city_gazetteer").
+        :param amount: Amount to add.
+        """
+        self.counters[name] += amount
+
+    def snapshot(self):
+        """
+        Collect every stage, counter and cache statistic.
+
+        :return: A JSON-serializable dictionary.
+        """
+        return {
+            "stages": {name: histogram.summary() for name, histogram in list(self.stages.items())},
+            "counters": dict(self.counters),
+            "classification_paths": dict(classification_paths),
+            "weather": weather_client.stats(),
+            "startup_ms": dict(startup_timings)
+        }
+
+    def report(self):
+        """
+        Format the stage latencies and counters for the chat window.
+
+        :return: A multi-line string.
+        """
+        snapshot = self.snapshot()
+        lines = ["Stage latencies (ms): count mean p50 p95 p99 max"]
+        for name, s in sorted(snapshot["stages"].items()):
+            lines.append(f"  {name}: {s['count']} {s['mean_ms']:.3f} {s['p50_ms']:.3f} {s['p95_ms']:.3f} {s['p99_ms']:.3f} {s['max_ms']:.3f}")
+        counters = {**snapshot["counters"], **{f"classify_{k}": v for k, v in snapshot["classification_paths"].items()}}
+        lines.append("Counters: " + (", ".join(f"{k}={v}" for k, v in sorted(counters.items())) or "none"))
+        weather = snapshot["weather"]
+        lines.append(f"Weather cache: hit rate {weather['hit_rate']:.0%}, {weather['upstream_requests']} upstream requests")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """
+        Write a snapshot to a JSON file, replacing it atomically.
+
+        :param path: Destination file.
+        """
+        try:
+            with open(path + ".tmp", "w") as file:
+                json.dump({"time": time.time(), **self.snapshot()}, file, indent=2)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+    def start_dump(self, path, interval=60):
+        """
+        Dump a snapshot to a JSON file periodically on a daemon thread.
+
+        :param path: Destination file.
+        :param interval: Seconds between dumps.
+        """
+        self.stop_dump()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                self.dump(path)
+            self.dump(path)
+
+        thread = threading.Thread(target=run, name="metrics-dump", daemon=True)
+        thread.start()
+        self._dump_stop = (stop, thread)
+
+    def stop_dump(self):
+        """
+        Stop the periodic dump after writing one last snapshot.
+        """
+        if self._dump_stop is not None:
+            stop, thread = self._dump_stop
+            self._dump_stop = None
+            stop.set()
+            thread.join()
+
+
+metrics = Metrics()
+
+def start_profiler():
+    """
+    Start profiling the calling thread with cProfile.
+
+    Stop it with profiler.disable() and save it with profiler.dump_stats(path);
+    the result can be read with pstats or snakeviz.
+
+    :return: The running cProfile.Profile.
+    """
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+# spaCy is only needed to find city names, so it is loaded on first use with
+# every component except the named-entity recognizer left out
+SPACY_MODEL = "en_core_web_sm"
+SPACY_EXCLUDE = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer"]
+MODEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chatbot_cache")
 
-# Load spaCy's English model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except Exception as e:
-    messagebox.showerror("Error", f"Failed to load spaCy model: {e}")
-    exit()
+# Place names checked before falling back to spaCy; the index is rebuilt when this file changes
+GAZETTEER_SOURCE = os.environ.get("CITY_GAZETTEER", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cities.txt"))
+
+# Optional file the GUI appends the full chat transcript to
+CHAT_LOG = os.environ.get("CHATBOT_LOG")
+
+_nlp = None
+_nlp_failed = False
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """
+    Load spaCy's English model the first time it is needed.
+
+    :return: The spaCy pipeline, or None if it could not be loaded.
+    """
+    global _nlp, _nlp_failed
+    with _nlp_lock:
+        if _nlp is None and not _nlp_failed:
+            start = time.perf_counter()
+            try:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            except Exception as e:
+                _nlp_failed = True
+                print(f"Failed to load spaCy model: {e}")
+            startup_timings["spacy_load"] = (time.perf_counter() - start) * 1000
+        return _nlp
 
 # Weather API configuration
-API_KEY = "your_openweathermap_api_key"  # Replace with your OpenWeatherMap API key
-WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
+API_KEY = os.environ.get("OPENWEATHERMAP_API_KEY", "your_openweathermap_api_key")  # Replace with your OpenWeatherMap API key
+WEATHER_API_URL = os.environ.get("WEATHER_API_URL", "http://api.openweathermap.org/data/2.5/weather")
 
 # Predefined intents and responses
 intents = {
@@ -50,21 +293,658 @@ training_data = [
     ("what is your name", "name")
 ]
 
-texts, labels = zip(*training_data)
-vectorizer = CountVectorizer()
-X = vectorizer.fit_transform(texts)
-clf = MultinomialNB()
-clf.fit(X, labels)
+class KeywordMatcher:
+    TOKEN = re.compile(r"[a-z0-9']+")
+
+    def __init__(self, keywords):
+        """
+        Build an Aho-Corasick automaton over whole words from a keyword table.
+
+        Matching works on word tokens, so "hi" matches "hi there" but not
+        "this", and multi-word keywords such as "see you" match as phrases.
+
+        :param keywords: Mapping of intent to a list of keyword phrases.
+        """
+        self.goto = [{}]      # Node -> {token: child node}
+        self.output = [set()]  # Node -> intents of the phrases ending here
+        for intent, phrases in keywords.items():
+            for phrase in phrases:
+                node = 0
+                for token in self.TOKEN.findall(phrase.lower()):
+                    child = self.goto[node].get(token)
+                    if child is None:
+                        child = len(self.goto)
+                        self.goto[node][token] = child
+                        self.goto.append({})
+                        self.output.append(set())
+                    node = child
+                self.output[node].add(intent)
+
+        # Breadth-first pass to link each node to its longest proper suffix in the trie
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                suffix = self.fail[node]
+                while suffix and token not in self.goto[suffix]:
+                    suffix = self.fail[suffix]
+                target = self.goto[suffix].get(token, 0)
+                self.fail[child] = target if target != child else 0  # Children of the root fail to the root
+                self.output[child] |= self.output[self.fail[child]]
+
+    def match(self, text):
+        """
+        Find every intent whose keywords occur in a text, in one pass over its words.
+
+        :param text: The text to scan.
+        :return: A set of intents.
+        """
+        found = set()
+        node = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for token in self.TOKEN.findall(text.lower()):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if output[node]:
+                found |= output[node]
+        return found
+
+
+keyword_matcher = KeywordMatcher(intents)
+
+# How many messages each classification path answered
+classification_paths = Counter()
+
+_classifier = None
+
+def classifier_path():
+    """
+    Get the path of the saved classifier for the current training data.
+
+    The file name contains a hash of training_data and the scikit-learn
+    version, so a change to either trains a fresh model.
+
+    :return: Path of the pickled (vectorizer, classifier) pair.
+    """
+    key = json.dumps([training_data, metadata.version("scikit-learn")]).encode()
+    return os.path.join(MODEL_CACHE_DIR, f"intent_{hashlib.sha256(key).hexdigest()[:16]}.pkl")
+
+def train_classifier():
+    """
+    Train the intent classification model on training_data.
+
+    :return: A tuple (vectorizer, classifier).
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+
+    texts, labels = zip(*training_data)
+    vectorizer = CountVectorizer()
+    X = vectorizer.fit_transform(texts)
+    clf = MultinomialNB()
+    clf.fit(X, labels)
+    return vectorizer, clf
+
+def get_classifier():
+    """
+    Load the saved intent classifier, training and saving it if needed.
+
+    :return: A tuple (vectorizer, classifier).
+    """
+    global _classifier
+    if _classifier is None:
+        start = time.perf_counter()
+        path = classifier_path()
+        try:
+            with open(path, "rb") as file:
+                _classifier = pickle.load(file)
+            startup_timings["classifier_load"] = (time.perf_counter() - start) * 1000
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            _classifier = train_classifier()
+            os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as file:
+                pickle.dump(_classifier, file)
+            os.replace(path + ".tmp", path)
+            startup_timings["classifier_train"] = (time.perf_counter() - start) * 1000
+    return _classifier
+
+def classify_intent_with_path(user_input):
+    """
+    Classify the user's intent, trying the keyword table before the model.
+
+    A message whose keywords all point to one intent is answered by the
+    keyword matcher; the trained model only sees messages with no keyword
+    or with keywords of conflicting intents.
+
+    :param user_input: The user's input text.
+    :return: A tuple (intent, path) where path is "keyword" or "model".
+    """
+    start = time.perf_counter()
+    matched = keyword_matcher.match(user_input)
+    if len(matched) == 1:
+        classification_paths["keyword"] += 1
+        metrics.record("classify", start)
+        return next(iter(matched)), "keyword"
+    vectorizer, clf = get_classifier()
+    X_user = vectorizer.transform([user_input])
+    classification_paths["model"] += 1
+    intent = clf.predict(X_user)[0]
+    metrics.record("classify", start)
+    return intent, "model"
 
 def classify_intent(user_input):
     """
-    Classify the user's intent using the trained model.
+    Classify the user's intent using the keyword table or the trained model.
     
     :param user_input: The user's input text.
     :return: The predicted intent.
     """
-    X_user = vectorizer.transform([user_input])
-    return clf.predict(X_user)[0]
+    return classify_intent_with_path(user_input)[0]
+
+def classify_batch(batch):
+    """
+    Classify one batch of messages, sending only the unresolved ones to the model.
+
+    :param batch: List of message texts.
+    :return: A list of predicted intents in input order.
+    """
+    start = time.perf_counter()
+    results = []
+    unresolved = []
+    for i, message in enumerate(batch):
+        matched = keyword_matcher.match(message)
+        if len(matched) == 1:
+            results.append(next(iter(matched)))
+        else:
+            results.append(None)
+            unresolved.append(i)
+    if unresolved:
+        vectorizer, clf = get_classifier()
+        predicted = clf.predict(vectorizer.transform([batch[i] for i in unresolved]))
+        for i, intent in zip(unresolved, predicted):
+            results[i] = intent
+    classification_paths["keyword"] += len(batch) - len(unresolved)
+    classification_paths["model"] += len(unresolved)
+    metrics.record("classify_batch", start)
+    return results
+
+def batches(items, batch_size):
+    """
+    Split an iterable into lists of at most batch_size items.
+
+    :param items: Any iterable.
+    :param batch_size: Maximum number of items per list.
+    :return: A generator of lists.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def classify_intents(messages, batch_size=4096):
+    """
+    Classify many messages, one sparse-matrix prediction per batch.
+
+    Messages the keyword matcher resolves skip the model entirely.
+
+    :param messages: Iterable of message texts; it is consumed lazily.
+    :param batch_size: Number of messages classified at once.
+    :return: A generator of predicted intents in input order.
+    """
+    for batch in batches(messages, batch_size):
+        yield from classify_batch(batch)
+
+class Gazetteer:
+    MAGIC = b"GAZ2"
+    HEADER = struct.Struct("<4sqqII")  # magic, source size, source mtime_ns, name count, longest name in words
+    # A word starts with a letter; "'", "." and "-" only count inside it, so "Paris." matches "paris"
+    WORD = re.compile(r"[^\W\d_](?:\w|['.-](?=\w))*")
+
+    def __init__(self, index_path):
+        """
+        Open a gazetteer index memory-mapped.
+
+        The index holds the sorted, normalized place names back to back,
+        preceded by an offset table, so opening it costs no parsing and
+        lookups are binary searches over the mapped bytes.
+
+        :param index_path: Path of an index written by Gazetteer.build.
+        """
+        with open(index_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.source_size, self.source_mtime, self.count, self.max_words = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC:
+            raise ValueError(f"{index_path} is not a gazetteer index")
+        start = self.HEADER.size
+        self._offsets = memoryview(self._map)[start:start + 4 * (self.count + 1)].cast("I")
+        self._data_start = start + 4 * (self.count + 1)
+
+    @classmethod
+    def normalize(cls, name):
+        """
+        Turn a place name into its index key.
+
+        :param name: A place name.
+        :return: The name's words, lower-cased and joined by single spaces.
+        """
+        return " ".join(cls.WORD.findall(name.lower()))
+
+    @classmethod
+    def build(cls, source_path, index_path):
+        """
+        Build an index from a text file of place names.
+
+        Each line holds one name; for tab-separated files in GeoNames
+        format, the name and ASCII name columns are both indexed.
+
+        :param source_path: Path of the place-name file.
+        :param index_path: Path of the index to write.
+        """
+        names = set()
+        with open(source_path, encoding="utf-8") as file:
+            for line in file:
+                fields = line.rstrip("\n").split("\t")
+                for field in (fields[1:3] if len(fields) > 2 else fields[:1]):
+                    name = cls.normalize(field)
+                    if name:
+                        names.add(name.encode("utf-8"))
+        names = sorted(names)
+
+        offsets = array("I", [0])
+        for name in names:
+            offsets.append(offsets[-1] + len(name))
+        stat = os.stat(source_path)
+        max_words = max((name.count(b" ") + 1 for name in names), default=0)
+        with open(index_path + ".tmp", "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, stat.st_size, stat.st_mtime_ns, len(names), max_words))
+            file.write(offsets.tobytes())
+            for name in names:
+                file.write(name)
+        os.replace(index_path + ".tmp", index_path)
+
+    @classmethod
+    def load(cls, source_path, index_path):
+        """
+        Open the index for a place-name file, building it first if it is missing or stale.
+
+        :param source_path: Path of the place-name file.
+        :param index_path: Path of the index.
+        :return: A Gazetteer.
+        """
+        stat = os.stat(source_path)
+        try:
+            gazetteer = cls(index_path)
+            if (gazetteer.source_size, gazetteer.source_mtime) == (stat.st_size, stat.st_mtime_ns):
+                return gazetteer
+        except (OSError, ValueError, struct.error):
+            pass
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        cls.build(source_path, index_path)
+        return cls(index_path)
+
+    def _name(self, i):
+        return self._map[self._data_start + self._offsets[i]:self._data_start + self._offsets[i + 1]]
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, name):
+        return self._lookup(self.normalize(name).encode("utf-8"))
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _lookup(self, key):
+        i = self._lower_bound(key)
+        return i < self.count and self._name(i) == key
+
+    def _starts_any(self, word):
+        # Names beginning with this word sort directly after it, so one search tells
+        i = self._lower_bound(word)
+        if i == self.count:
+            return False
+        name = self._name(i)
+        return name == word or name.startswith(word + b" ")
+
+    def find(self, text):
+        """
+        Find the first place name in a text, preferring the longest match at each word.
+
+        :param text: The text to scan.
+        :return: The place name as written in the text, or None.
+        """
+        words = list(self.WORD.finditer(text))
+        keys = [word.group().lower() for word in words]
+        for i in range(len(words)):
+            if not self._starts_any(keys[i].encode("utf-8")):
+                continue
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                if self._lookup(" ".join(keys[i:i + n]).encode("utf-8")):
+                    return text[words[i].start():words[i + n - 1].end()]
+        return None
+
+
+_gazetteer = None
+_gazetteer_failed = False
+
+def get_gazetteer():
+    """
+    Open the city gazetteer the first time it is needed.
+
+    :return: The Gazetteer, or None if no place-name file is available.
+    """
+    global _gazetteer, _gazetteer_failed
+    if _gazetteer is None and not _gazetteer_failed:
+        start = time.perf_counter()
+        try:
+            _gazetteer = Gazetteer.load(GAZETTEER_SOURCE, os.path.join(MODEL_CACHE_DIR, "cities.idx"))
+        except OSError as e:
+            _gazetteer_failed = True
+            print(f"City gazetteer unavailable, using spaCy only: {e}")
+        startup_timings["gazetteer_load"] = (time.perf_counter() - start) * 1000
+    return _gazetteer
+
+def find_city(text):
+    """
+    Find the first city in a text, using spaCy only when the gazetteer has none.
+
+    :param text: The text to scan.
+    :return: The city name, or None if there is none.
+    """
+    start = time.perf_counter()
+    gazetteer = get_gazetteer()
+    city = gazetteer.find(text) if gazetteer is not None else None
+    if city is not None:
+        metrics.count("city_gazetteer")
+    else:
+        nlp = get_nlp()
+        if nlp is not None:
+            ner_start = time.perf_counter()
+            city = first_city(nlp(text))
+            metrics.record("ner", ner_start)
+            metrics.count("city_spacy" if city else "city_none")
+    metrics.record("city", start)
+    return city
+
+def first_city(doc):
+    """
+    Find the first geopolitical entity in a spaCy document.
+
+    :param doc: A processed spaCy Doc.
+    :return: The entity text, or None if there is none.
+    """
+    for ent in doc.ents:
+        if ent.label_ == "GPE":  # Geopolitical entity (e.g., city, country)
+            return ent.text
+    return None
+
+# Marks a text whose city is still being looked up by spaCy
+_WAITING = object()
+
+def _cities_in_order(items, batch_size, n_process, max_pending):
+    """
+    Find the first city in a stream of texts, keeping input order with bounded read-ahead.
+
+    Texts are checked against the gazetteer first; the ones it finds nothing
+    in are queued for a single spaCy pipe that runs for the whole stream.
+    Every other item is yielded as soon as no earlier item waits on spaCy.
+    The pipe is only asked for results once it has a full batch queued or
+    max_pending items wait to be yielded; in the latter case it is padded
+    with empty texts, so it returns a partial batch without reading more.
+
+    :param items: Iterable of (item, text) pairs; text is None for items that need no city.
+    :param batch_size: Number of texts spaCy processes per batch.
+    :param n_process: Number of spaCy worker processes.
+    :param max_pending: Maximum number of items read but not yet yielded.
+    :return: A generator of (item, city) pairs in input order.
+    """
+    gazetteer = get_gazetteer()
+    pending = deque()  # [item, city] of the items read but not yet yielded, the first one always _WAITING
+    feed = deque()     # Texts queued for spaCy
+    # spaCy reads one batch ahead, or two per worker process
+    fill = batch_size * (2 * n_process if n_process > 1 else 1)
+    finished = False
+    loaded = False
+    cities = None  # City of every text fed to spaCy, in order; None when spaCy is unavailable
+
+    def feeder():
+        while feed or not finished:
+            if feed:
+                yield feed.popleft(), True
+            else:
+                yield "", False
+
+    def resolve(city):
+        pending[0][1] = city
+        while pending and pending[0][1] is not _WAITING:
+            item, city = pending.popleft()
+            yield item, city
+
+    for item, text in items:
+        city = None
+        if text is not None:
+            city = gazetteer.find(text) if gazetteer is not None else None
+            if city is None and not loaded:
+                loaded = True  # spaCy is only loaded once the gazetteer misses
+                nlp = get_nlp()
+                if nlp is not None:
+                    docs = nlp.pipe(feeder(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+                    cities = (first_city(doc) for doc, real in docs if real)
+            if city is None and cities is not None:
+                city = _WAITING
+                feed.append(text)
+        if not pending and city is not _WAITING:
+            yield item, city
+            continue
+        pending.append([item, city])
+        while len(feed) >= fill or len(pending) >= max_pending:
+            yield from resolve(next(cities))
+    finished = True
+    while pending:
+        yield from resolve(next(cities))
+
+def extract_cities(texts, batch_size=256, n_process=1, max_pending=4096):
+    """
+    Find the first city named in each of many texts.
+
+    Texts are checked against the gazetteer first; only the texts it finds
+    nothing in are streamed through one spaCy pipe, which runs for the
+    whole input instead of being restarted per batch.
+
+    :param texts: Iterable of texts; it is consumed lazily.
+    :param batch_size: Number of texts spaCy processes per batch.
+    :param n_process: Number of spaCy worker processes.
+    :param max_pending: Maximum number of texts read ahead of the output.
+    :return: A generator of city names (or None) in input order.
+    """
+    for _, city in _cities_in_order(((None, text) for text in texts), batch_size, n_process, max_pending):
+        yield city
+
+def process_messages(messages, batch_size=4096, ner_batch_size=256, n_process=1, max_pending=4096):
+    """
+    Classify many messages and extract the city from the weather questions.
+
+    Messages are classified in batches of batch_size, and the weather-intent
+    ones of every batch go through a single spaCy pipe, so the pipe and its
+    worker processes are started once. At most batch_size + max_pending
+    messages are held in memory.
+
+    :param messages: Iterable of message texts; it is consumed lazily.
+    :param batch_size: Number of messages classified at once.
+    :param ner_batch_size: Number of texts spaCy processes per batch.
+    :param n_process: Number of spaCy worker processes.
+    :param max_pending: Maximum number of classified messages waiting for earlier cities.
+    :return: A generator of (message, intent, city) tuples in input order; city is None unless intent is "weather".
+    """
+    def classified():
+        for batch in batches(messages, batch_size):
+            for message, intent in zip(batch, classify_batch(batch)):
+                yield (message, intent), message if intent == "weather" else None
+
+    for (message, intent), city in _cities_in_order(classified(), ner_batch_size, n_process, max_pending):
+        yield message, intent, city
+
+class WeatherClient:
+    def __init__(self, api_key=API_KEY, url=WEATHER_API_URL, ttl=600, max_size=1024, timeout=5, pool_size=10):
+        """
+        Initialize a weather client with a connection pool and a per-city cache.
+
+        :param api_key: OpenWeatherMap API key.
+        :param url: Weather endpoint; point it at a local server for testing.
+        :param ttl: Number of seconds a city's weather is reused.
+        :param max_size: Maximum number of cached cities; the least recently used are evicted first.
+        :param timeout: Seconds to wait for the weather service.
+        :param pool_size: Number of pooled connections kept open.
+        """
+        self.api_key = api_key
+        self.url = url
+        self.ttl = ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache = OrderedDict()  # city key -> ((description, temperature), fetched_at)
+        self._inflight = {}          # city key -> Future shared by concurrent callers
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.upstream_requests = 0
+        self.upstream_seconds = 0.0
+        self.upstream_max_seconds = 0.0
+
+    @staticmethod
+    def normalize(city):
+        """
+        Turn a city name into its cache key.
+
+        :param city: The name of the city as typed.
+        :return: The name case-folded with whitespace collapsed.
+        """
+        return " ".join(city.split()).casefold()
+
+    def _fetch(self, city):
+        params = {
+            "q": city,
+            "appid": self.api_key,
+            "units": "metric"
+        }
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+        finally:
+            metrics.record("weather_http", start)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.upstream_requests += 1
+                self.upstream_seconds += elapsed
+                self.upstream_max_seconds = max(self.upstream_max_seconds, elapsed)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        return data["weather"][0]["description"], data["main"]["temp"]
+
+    def lookup(self, city):
+        """
+        Get the weather for a city, from the cache or a single upstream request.
+
+        Concurrent lookups of the same city share one request.
+
+        :param city: The name of the city.
+        :return: A tuple (description, temperature), or None if the service had no answer.
+        """
+        key = self.normalize(city)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.collapsed += 1
+
+        if leader:
+            try:
+                weather = self._fetch(city)
+            except Exception as e:
+                with self._lock:
+                    del self._inflight[key]
+                future.set_exception(e)
+                raise
+            with self._lock:
+                del self._inflight[key]
+                if weather is not None:
+                    self._cache[key] = (weather, time.monotonic())
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_size:
+                        self._cache.popitem(last=False)
+            future.set_result(weather)
+        return future.result()
+
+    def get(self, city):
+        """
+        Get a sentence describing the weather in a city.
+
+        :param city: The name of the city.
+        :return: A string containing the weather information.
+        """
+        start = time.perf_counter()
+        try:
+            weather = self.lookup(city)
+            if weather is None:
+                return "Sorry, I couldn't fetch the weather information."
+            description, temperature = weather
+            return f"The weather in {city} is {description} with a temperature of {temperature}°C."
+        except Exception as e:
+            # Details stay in the log: request errors quote the URL, API key included
+            metrics.count("weather_errors")
+            print(f"Error fetching weather data for {city}: {str(e).replace(self.api_key, '***')}", file=sys.stderr)
+            return "Sorry, I couldn't fetch the weather information."
+        finally:
+            metrics.record("weather", start)
+
+    def stats(self):
+        """
+        Get cache and upstream counters.
+
+        :return: A dictionary with hit/miss counts, hit rate and upstream latency.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.collapsed
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "collapsed": self.collapsed,
+                "hit_rate": (self.hits + self.collapsed) / lookups if lookups else 0.0,
+                "upstream_requests": self.upstream_requests,
+                "upstream_mean_ms": self.upstream_seconds / self.upstream_requests * 1000 if self.upstream_requests else 0.0,
+                "upstream_max_ms": self.upstream_max_seconds * 1000
+            }
+
+
+weather_client = WeatherClient()
 
 def get_weather(city):
     """
@@ -73,33 +953,208 @@ def get_weather(city):
     :param city: The name of the city.
     :return: A string containing the weather information.
     """
-    try:
-        params = {
-            "q": city,
-            "appid": API_KEY,
-            "units": "metric"
-        }
-        response = requests.get(WEATHER_API_URL, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            weather = data["weather"][0]["description"]
-            temperature = data["main"]["temp"]
-            return f"The weather in {city} is {weather} with a temperature of {temperature}°C."
+    return weather_client.get(city)
+
+def weather_reply(user_input):
+    """
+    Answer a weather question: find the city, then look up its weather.
+
+    This can block on loading the city index or spaCy and on the network, so the GUI runs it
+    on a worker thread.
+
+    :param user_input: The user's input text.
+    :return: The chatbot's reply.
+    """
+    city = find_city(user_input)
+    if not city and get_nlp() is None and get_gazetteer() is None:
+        return "Sorry, I can't look up cities right now."
+    if not city:
+        return "Please specify a city for the weather."
+    return get_weather(city)
+
+class ChatSession:
+    __slots__ = ("session_id", "history", "created", "last_active", "turns")
+
+    def __init__(self, session_id, max_history=20):
+        """
+        Initialize the state of one conversation.
+
+        :param session_id: Identifier chosen by the client.
+        :param max_history: Number of recent (message, reply) pairs kept.
+        """
+        self.session_id = session_id
+        self.history = deque(maxlen=max_history)
+        self.created = time.monotonic()
+        self.last_active = self.created
+        self.turns = 0
+
+class Transcript:
+    def __init__(self, max_lines=1000, log_path=None):
+        """
+        Initialize the chat transcript shown in the GUI.
+
+        Only the most recent lines are kept in memory; the full history can
+        be appended to a log file instead. New lines wait in a pending list
+        until the GUI draws them in its next frame.
+
+        :param max_lines: Number of recent lines kept and displayed.
+        :param log_path: Optional file every line is appended to.
+        """
+        self.lines = deque(maxlen=max_lines)
+        self.pending = []
+        self.log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def append(self, message):
+        """
+        Add a message to the transcript.
+
+        :param message: The message text, possibly spanning several lines.
+        """
+        for line in message.split("\n"):
+            self.lines.append(line)
+            self.pending.append(line)
+        if self.log:
+            self.log.write(message + "\n")
+
+    def take_pending(self):
+        """
+        Get the lines added since the last call and flush the log file.
+
+        :return: A list of lines, oldest first.
+        """
+        pending, self.pending = self.pending, []
+        if self.log:
+            self.log.flush()
+        return pending
+
+    def close(self):
+        """
+        Close the log file.
+        """
+        if self.log:
+            self.log.close()
+            self.log = None
+
+
+class ChatEngine:
+    def __init__(self, max_history=20):
+        """
+        Initialize a chatbot engine that serves any number of sessions.
+
+        The pipeline is split into classify() and reply() so a server can
+        classify messages from many sessions in one batch and run the
+        blocking weather path on its own executor.
+
+        :param max_history: Number of recent turns kept per session.
+        """
+        self.max_history = max_history
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, session_id):
+        """
+        Get a session, creating it on first use.
+
+        :param session_id: Identifier chosen by the client.
+        :return: The ChatSession.
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = ChatSession(session_id, self.max_history)
+            return session
+
+    def end_session(self, session_id):
+        """
+        Forget a session.
+
+        :param session_id: Identifier chosen by the client.
+        :return: True if the session existed, False otherwise.
+        """
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def expire(self, idle_seconds):
+        """
+        Forget sessions that have been idle for too long.
+
+        :param idle_seconds: Maximum idle time in seconds.
+        :return: Number of sessions removed.
+        """
+        cutoff = time.monotonic() - idle_seconds
+        with self._lock:
+            idle = [session_id for session_id, session in self.sessions.items() if session.last_active < cutoff]
+            for session_id in idle:
+                del self.sessions[session_id]
+        return len(idle)
+
+    def classify(self, messages):
+        """
+        Classify a batch of messages, possibly from different sessions.
+
+        :param messages: List of message texts.
+        :return: A list of intents in input order.
+        """
+        return [str(intent) for intent in classify_batch(messages)]
+
+    def reply(self, session_id, message, intent):
+        """
+        Produce the reply to a classified message and record the turn.
+
+        This blocks on the network for weather questions. The message
+        STATS_COMMAND is answered with the pipeline metrics.
+
+        :param session_id: Identifier chosen by the client.
+        :param message: The user's message.
+        :param intent: The message's intent from classify().
+        :return: The chatbot's reply.
+        """
+        start = time.perf_counter()
+        if message == STATS_COMMAND:
+            text = metrics.report()
+        elif intent == "weather":
+            text = weather_reply(message)
         else:
-            return "Sorry, I couldn't fetch the weather information."
-    except Exception as e:
-        return f"Error fetching weather data: {e}"
+            text = random.choice(responses.get(intent, responses["default"]))
+        session = self.session(session_id)
+        session.history.append((message, text))
+        session.turns += 1
+        session.last_active = time.monotonic()
+        metrics.record("reply", start)
+        return text
+
+    def respond(self, session_id, message):
+        """
+        Run the whole pipeline for a single message.
+
+        :param session_id: Identifier chosen by the client.
+        :param message: The user's message.
+        :return: A tuple (intent, reply).
+        """
+        intent = str(classify_intent(message))
+        return intent, self.reply(session_id, message, intent)
 
 class ChatbotGUI:
-    def __init__(self, root):
+    def __init__(self, root, max_lines=1000, log_path=CHAT_LOG, frame_interval=16):
         """
         Initialize the Chatbot GUI.
-        
+
         :param root: The root window of the application.
+        :param max_lines: Number of recent lines kept in the chat area.
+        :param log_path: Optional file the full transcript is appended to.
+        :param frame_interval: Milliseconds between redraws of the chat area.
         """
+        load_gui()
         self.root = root
         self.root.title("ChatBot")
         self.root.geometry("500x400")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.engine = ChatEngine()
+        self.session_id = "gui"
+        self.transcript = Transcript(max_lines, log_path)
+        self.frame_interval = frame_interval
+        self.frame_scheduled = False
 
         # Chat display area
         self.chat_area = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, state="disabled")
@@ -123,12 +1178,42 @@ class ChatbotGUI:
         """
         Display a message in the chat area.
         
+        The message is drawn with everything else added in the same frame.
+
         :param message: The message to display.
         """
+        self.transcript.append(message)
+        if not self.frame_scheduled:
+            self.frame_scheduled = True
+            self.root.after(self.frame_interval, self.render)
+
+    def render(self):
+        """
+        Draw the pending transcript lines and drop lines beyond the limit.
+        """
+        self.frame_scheduled = False
+        lines = self.transcript.take_pending()
+        if not lines:
+            return
+        start = time.perf_counter()
         self.chat_area.config(state="normal")
-        self.chat_area.insert(tk.END, message + "\n")
+        self.chat_area.insert(tk.END, "\n".join(lines) + "\n")
+        # The widget always ends with an empty line after the last newline
+        excess = int(self.chat_area.index("end-1c").split(".")[0]) - 1 - self.transcript.lines.maxlen
+        if excess > 0:
+            self.chat_area.delete("1.0", f"{excess + 1}.0")
         self.chat_area.config(state="disabled")
         self.chat_area.yview(tk.END)  # Auto-scroll to the bottom
+        metrics.record("render", start)
+        metrics.count("rendered_lines", len(lines))
+
+    def close(self):
+        """
+        Close the transcript log and the window.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.transcript.close()
+        self.root.destroy()
 
     def send_message(self, event=None):
         """
@@ -141,26 +1226,48 @@ class ChatbotGUI:
             self.user_input.delete(0, tk.END)  # Clear the input field
 
             # Classify the intent
-            intent = classify_intent(user_input)
+            intent = self.engine.classify([user_input])[0]
 
-            # Generate a response based on the intent
+            # Generate a response based on the intent; weather questions wait on the network
             if intent == "weather":
-                doc = nlp(user_input)
-                city = None
-                for ent in doc.ents:
-                    if ent.label_ == "GPE":  # Geopolitical entity (e.g., city, country)
-                        city = ent.text
-                        break
-                if city:
-                    weather_info = get_weather(city)
-                    self.display_message(f"ChatBot: {weather_info}")
-                else:
-                    self.display_message("ChatBot: Please specify a city for the weather.")
+                future = self.executor.submit(self.engine.reply, self.session_id, user_input, intent)
+                self.reply_when_done(future)
             else:
-                response = responses.get(intent, responses["default"])
-                self.display_message(f"ChatBot: {random.choice(response)}")
+                self.display_message(f"ChatBot: {self.engine.reply(self.session_id, user_input, intent)}")
+
+    def reply_when_done(self, future, poll_interval=50):
+        """
+        Display a reply computed on a worker thread once it is ready.
+
+        :param future: Future whose result is the reply text.
+        :param poll_interval: Milliseconds between checks.
+        """
+        if future.done():
+            self.display_message(f"ChatBot: {future.result()}")
+        else:
+            self.root.after(poll_interval, self.reply_when_done, future, poll_interval)
+
+def report_startup():
+    """
+    Print how long startup took once the window is on screen.
+    """
+    startup_timings["window_ready"] = (time.perf_counter() - _process_start) * 1000
+    print("Startup timings (ms): " + ", ".join(f"{name}={ms:.1f}" for name, ms in startup_timings.items()))
+
+
+startup_timings["imports"] = (time.perf_counter() - _process_start) * 1000
 
 if __name__ == "__main__":
+    load_gui()
     root = tk.Tk()
     chatbot_gui = ChatbotGUI(root)
-    root.mainloop()
\ No newline at end of file
+    # Load the classifier once the window is up, so the first reply is fast
+    root.after_idle(lambda: (get_classifier(), report_startup()))
+    profiler = start_profiler() if PROFILE_OUTPUT else None
+    if METRICS_FILE:
+        metrics.start_dump(METRICS_FILE, METRICS_INTERVAL)
+    root.mainloop()
+    metrics.stop_dump()
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(PROFILE_OUTPUT)
\ No newline at end of file
@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+import Basic_chatbot as chatbot
+from Http_protocol import BadRequest, latency_summary, read_request, send_request, write_response
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_FRAME_SIZE = 1 << 16  # Largest WebSocket payload accepted from a client
+
+class MicroBatcher:
+    def __init__(self, func, executor, max_batch=256, max_delay=0.002):
+        """
+        Collect items submitted by many coroutines and process them together.
+
+        A batch is flushed when it reaches max_batch items or max_delay
+        seconds after its first item arrived, whichever comes first.
+
+        :param func: Blocking callable taking a list of items and returning a list of results.
+        :param executor: Executor that runs func off the event loop.
+        :param max_batch: Largest batch passed to func.
+        :param max_delay: Longest time in seconds an item waits for its batch to fill.
+        """
+        self.func = func
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = []
+        self.timer = None
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item):
+        """
+        Add an item to the next batch and wait for its result.
+
+        :param item: The item to process.
+        :return: The item's result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self.flush)
+        return await future
+
+    def flush(self):
+        """
+        Send the pending items to the executor as one batch.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.get_running_loop().run_in_executor(self.executor, self.func, [item for item, _ in batch])
+        task.add_done_callback(lambda done: self._deliver(batch, done))
+
+    @staticmethod
+    def _deliver(batch, done):
+        if done.exception() is not None:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(done.exception())
+            return
+        for (_, future), result in zip(batch, done.result()):
+            if not future.done():
+                future.set_result(result)
+
+
+class ChatServer:
+    def __init__(self, engine, host="127.0.0.1", port=8765, workers=16, max_batch=256, max_delay=0.002, idle_timeout=1800):
+        """
+        Initialize an asyncio HTTP and WebSocket front end for a ChatEngine.
+
+        Messages from all sessions are classified in micro-batches on one
+        thread; weather questions, which block on the network, run on a
+        bounded pool of worker threads.
+
+        :param engine: The ChatEngine that holds the sessions.
+        :param host: Interface to listen on.
+        :param port: TCP port to listen on.
+        :param workers: Number of threads for blocking weather replies.
+        :param max_batch: Largest number of messages classified at once.
+        :param max_delay: Longest time in seconds a message waits for its batch.
+        :param idle_timeout: Seconds after which an inactive session is dropped.
+        """
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.classify_executor = ThreadPoolExecutor(max_workers=1)
+        self.reply_executor = ThreadPoolExecutor(max_workers=workers)
+        self.batcher = MicroBatcher(engine.classify, self.classify_executor, max_batch, max_delay)
+        self.turns = 0
+        self.connections = 0
+
+    async def turn(self, session_id, message):
+        """
+        Classify a message and produce the session's reply.
+
+        :param session_id: Identifier chosen by the client.
+        :param message: The user's message.
+        :return: A dictionary with the intent and reply.
+        """
+        start = time.perf_counter()
+        intent = await self.batcher.submit(message)
+        if intent == "weather":
+            loop = asyncio.get_running_loop()
+            reply = await loop.run_in_executor(self.reply_executor, self.engine.reply, session_id, message, intent)
+        else:
+            reply = self.engine.reply(session_id, message, intent)
+        self.turns += 1
+        chatbot.metrics.record("turn", start)
+        return {"session": session_id, "intent": intent, "reply": reply}
+
+    def stats(self):
+        """
+        Get server counters.
+
+        :return: A dictionary of counters.
+        """
+        return {
+            "sessions": len(self.engine.sessions),
+            "connections": self.connections,
+            "turns": self.turns,
+            "batches": self.batcher.batches,
+            "mean_batch_size": self.batcher.items / self.batcher.batches if self.batcher.batches else 0.0,
+            "metrics": chatbot.metrics.snapshot()
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve the HTTP requests of one keep-alive connection, or hand it over to WebSocket.
+
+        :param reader: asyncio StreamReader of the connection.
+        :param writer: asyncio StreamWriter of the connection.
+        """
+        self.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                url = urlsplit(target)
+                if headers.get("upgrade", "").lower() == "websocket":
+                    session_id = parse_qs(url.query).get("session", [None])[0] or f"ws-{id(writer)}"
+                    await self.serve_websocket(reader, writer, headers, session_id)
+                    break
+                status, payload = await self.route(method, url.path, body)
+                write_response(writer, status, payload, keep_alive=headers.get("connection", "").lower() != "close")
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except BadRequest as e:
+            write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def route(self, method, path, body):
+        """
+        Answer one HTTP request.
+
+        :param method: HTTP method.
+        :param path: Path of the request target.
+        :param body: Request body as bytes.
+        :return: A tuple (status, payload) with the JSON-serializable response.
+        """
+        try:
+            if method == "POST" and path in ("/chat", "/end"):
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    return 400, {"error": "Body must be a JSON object."}
+            if method == "POST" and path == "/chat":
+                if not isinstance(data.get("message"), str) or not data.get("session"):
+                    return 400, {"error": "Expected JSON with 'session' and 'message'."}
+                return 200, await self.turn(str(data["session"]), data["message"].strip())
+            if method == "POST" and path == "/end":
+                return 200, {"ended": self.engine.end_session(str(data.get("session")))}
+            if method == "GET" and path == "/stats":
+                return 200, self.stats()
+            return 404, {"error": f"No route for {method} {path}"}
+        except ValueError:  # Malformed JSON or text that is not UTF-8
+            return 400, {"error": "Body is not valid JSON."}
+
+    async def serve_websocket(self, reader, writer, headers, session_id):
+        """
+        Complete a WebSocket handshake and answer each text frame as a chat turn.
+
+        :param reader: asyncio StreamReader of the connection.
+        :param writer: asyncio StreamWriter of the connection.
+        :param headers: Headers of the upgrade request.
+        :param session_id: Session the messages belong to.
+        """
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        await writer.drain()
+        while True:
+            try:
+                opcode, payload = await read_frame(reader)
+            except FrameTooLarge:
+                writer.write(encode_frame(0x8, (1009).to_bytes(2, "big")))  # 1009: message too big
+                await writer.drain()
+                return
+            if opcode == 0x8:  # Close
+                writer.write(encode_frame(0x8, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == 0x9:  # Ping
+                writer.write(encode_frame(0xA, payload))
+            elif opcode == 0x1:  # Text
+                try:
+                    message = json.loads(payload).get("message", "")
+                except (ValueError, AttributeError):
+                    message = payload.decode("utf-8", "replace")
+                result = await self.turn(session_id, str(message).strip())
+                writer.write(encode_frame(0x1, json.dumps(result).encode()))
+            await writer.drain()
+
+    async def expire_sessions(self):
+        """
+        Drop idle sessions once a minute until cancelled.
+        """
+        while True:
+            await asyncio.sleep(60)
+            self.engine.expire(self.idle_timeout)
+
+    async def serve(self):
+        """
+        Warm up the models and serve until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.classify_executor, chatbot.get_classifier)
+        await loop.run_in_executor(self.reply_executor, chatbot.get_gazetteer)
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=4096)
+        print(f"Chatbot server listening on {self.host}:{self.port}", file=sys.stderr)
+        expiry = asyncio.create_task(self.expire_sessions())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+
+
+class FrameTooLarge(ValueError):
+    """
+    Raised for a WebSocket frame longer than the server accepts.
+    """
+
+async def read_frame(reader, max_size=MAX_FRAME_SIZE):
+    """
+    Read one WebSocket frame sent by a client.
+
+    :param reader: asyncio StreamReader of the connection.
+    :param max_size: Largest payload accepted, in bytes.
+    :return: A tuple (opcode, payload).
+    :raises FrameTooLarge: If the payload is longer than max_size; it is left unread.
+    """
+    first, second = await reader.readexactly(2)
+    if not first & 0x80:
+        raise ValueError("Fragmented WebSocket messages are not supported")
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    if length > max_size:
+        raise FrameTooLarge(f"Frame of {length} bytes exceeds {max_size}")
+    mask = await reader.readexactly(4) if second & 0x80 else b"\0\0\0\0"
+    payload = await reader.readexactly(length)
+    # Unmask the whole payload with one big-integer XOR
+    repeated = (mask * (length // 4 + 1))[:length]
+    payload = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+    return first & 0x0F, payload
+
+def encode_frame(opcode, payload):
+    """
+    Encode an unmasked, unfragmented WebSocket frame sent by the server.
+
+    :param opcode: Frame opcode (e.g. 0x1 for text).
+    :param payload: Payload as bytes.
+    :return: The frame as bytes.
+    """
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([len(payload)])
+    elif len(payload) < 1 << 16:
+        header += bytes([126]) + len(payload).to_bytes(2, "big")
+    else:
+        header += bytes([127]) + len(payload).to_bytes(8, "big")
+    return header + payload
+
+
+async def load_test(host, port, sessions, requests_per_session, messages):
+    """
+    Drive the server with many concurrent keep-alive sessions.
+
+    :param host: Server host.
+    :param port: Server port.
+    :param sessions: Number of concurrent sessions, one connection each.
+    :param requests_per_session: Messages sent by each session, one after another.
+    :param messages: Messages to cycle through.
+    :return: A dictionary with throughput and latency percentiles.
+    """
+    latencies = []
+    errors = 0
+
+    async def session(n):
+        nonlocal errors
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            errors += requests_per_session
+            return
+        try:
+            for i in range(requests_per_session):
+                payload = {"session": f"load-{n}", "message": messages[(n + i) % len(messages)]}
+                start = time.perf_counter()
+                status, _ = await send_request(reader, writer, host, "POST", "/chat", payload)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors += 1
+        except (OSError, asyncio.IncompleteReadError):
+            errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(n) for n in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "sessions": sessions,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        **latency_summary(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-session chatbot server and load-test client.")
+    parser.add_argument("mode", choices=["serve", "loadtest"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=16, help="threads for blocking weather replies")
+    parser.add_argument("--max-batch", type=int, default=256, help="largest classification batch")
+    parser.add_argument("--max-delay", type=float, default=0.002, help="seconds a message waits for its batch")
+    parser.add_argument("--sessions", type=int, default=1000, help="load test: concurrent sessions")
+    parser.add_argument("--requests", type=int, default=20, help="load test: messages per session")
+    parser.add_argument("--include-weather", action="store_true", help="load test: also send weather questions")
+    parser.add_argument("--metrics-file", default=chatbot.METRICS_FILE, help="serve: dump metrics to this JSON file periodically")
+    parser.add_argument("--metrics-interval", type=float, default=chatbot.METRICS_INTERVAL, help="serve: seconds between metrics dumps")
+    parser.add_argument("--profile", default=chatbot.PROFILE_OUTPUT, help="serve: write cProfile stats of the event loop to this file")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        server = ChatServer(chatbot.ChatEngine(), args.host, args.port, args.workers, args.max_batch, args.max_delay)
+        profiler = chatbot.start_profiler() if args.profile else None
+        if args.metrics_file:
+            chatbot.metrics.start_dump(args.metrics_file, args.metrics_interval)
+        try:
+            asyncio.run(server.serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            chatbot.metrics.stop_dump()
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+    else:
+        messages = ["hi", "tell me a joke", "thanks", "what is your name", "bye", "how are things going"]
+        if args.include_weather:
+            messages.append("what is the weather in London")
+        print(json.dumps(asyncio.run(load_test(args.host, args.port, args.sessions, args.requests, messages)), indent=2))
@@ -1,6 +1,392 @@
+import hashlib
+import json
+import mmap
+import os
 import random
-import tkinter as tk
-from tkinter import messagebox
+import re
+import struct
+from array import array
+
+# tkinter is only imported when a window is opened (see load_gui), so the
+# game engine can also run in simulations and servers
+tk = messagebox = None
+
+def load_gui():
+    """
+    Import tkinter into this module's namespace.
+    """
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+
+# Built-in word lists, always part of the word bank
+BUILTIN_WORDS = {
+    "animals": [
+        "elephant", "giraffe", "kangaroo", "penguin", "dolphin",
+        "cat", "dog", "owl", "fox", "bee", "yak", "emu", "lion", "bear", "wolf", "frog", "duck", "goat",
+        "tiger", "zebra", "rabbit", "monkey", "parrot", "octopus", "hamster", "squirrel", "flamingo", "crocodile"
+    ],
+    "countries": [
+        "canada", "brazil", "japan", "germany", "australia",
+        "peru", "chad", "cuba", "iran", "iraq", "oman", "togo", "mali", "fiji", "laos",
+        "india", "spain", "france", "mexico", "norway", "argentina", "portugal", "indonesia", "singapore"
+    ],
+    "programming": [
+        "python", "javascript", "algorithm", "function", "variable",
+        "loop", "byte", "list", "code", "bool", "char", "enum", "heap", "node", "bit",
+        "array", "class", "string", "lambda", "module", "compiler", "iterator", "recursion", "interface"
+    ]
+}
+
+# Word-length buckets used by the difficulty levels, as inclusive (shortest, longest) ranges
+WORD_LENGTHS = {
+    "short": (1, 4),
+    "medium": (5, 7),
+    "long": (8, 64)
+}
+
+# Difficulty levels; word_length names a bucket in WORD_LENGTHS
+DIFFICULTIES = {
+    "easy": {"max_attempts": 8, "word_length": "short"},
+    "medium": {"max_attempts": 6, "word_length": "medium"},
+    "hard": {"max_attempts": 4, "word_length": "long"}
+}
+
+# Points for a letter in the word and for a letter that is not
+HIT_POINTS = 10
+MISS_POINTS = -5
+
+# Directory of extra word lists, one "<category>.txt" file per category with one word per line
+WORD_LIST_DIR = os.environ.get("HANGMAN_WORDS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "word_lists"))
+WORD_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".hangman_cache", "words.idx")
+
+class WordBank:
+    MAGIC = b"HWB1"
+    HEADER = struct.Struct("<4s16sII")  # magic, source digest, word count, bucket table length
+    WORD = re.compile(r"[a-z]+")
+
+    def __init__(self, index_path):
+        """
+        Open a word bank index memory-mapped.
+
+        The index holds every word back to back, grouped by category and
+        word-length bucket, preceded by an offset table and a table of
+        bucket ranges. Picking a word is one random index into a range, so
+        no word list is filtered or even read when a game starts.
+
+        :param index_path: Path of an index written by WordBank.build.
+        """
+        with open(index_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.digest, self.count, table_length = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC:
+            raise ValueError(f"{index_path} is not a word bank index")
+        start = self.HEADER.size
+        self.buckets = {
+            (category, bucket): (first, last)
+            for category, bucket, first, last in json.loads(self._map[start:start + table_length])
+        }
+        start += table_length
+        self._offsets = memoryview(self._map)[start:start + 4 * (self.count + 1)].cast("I")
+        self._data_start = start + 4 * (self.count + 1)
+
+    @staticmethod
+    def sources(directory):
+        """
+        List the word-list files in a directory.
+
+        :param directory: Directory of "<category>.txt" files; it may not exist.
+        :return: A sorted list of (category, path) tuples.
+        """
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return sorted(
+            (name[:-4].lower(), os.path.join(directory, name)) for name in names if name.endswith(".txt")
+        )
+
+    @classmethod
+    def source_digest(cls, directory):
+        """
+        Fingerprint everything an index is built from.
+
+        :param directory: Directory of "<category>.txt" files.
+        :return: 16 bytes that change whenever a source file, the built-in lists or the buckets change.
+        """
+        stats = []
+        for _, path in cls.sources(directory):
+            stat = os.stat(path)
+            stats.append((path, stat.st_size, stat.st_mtime_ns))
+        key = json.dumps([stats, BUILTIN_WORDS, WORD_LENGTHS]).encode()
+        return hashlib.sha256(key).digest()[:16]
+
+    @staticmethod
+    def bucket_of(word):
+        """
+        Get the word-length bucket of a word.
+
+        :param word: The word.
+        :return: The bucket name, or None if the word fits no bucket.
+        """
+        for bucket, (shortest, longest) in WORD_LENGTHS.items():
+            if shortest <= len(word) <= longest:
+                return bucket
+        return None
+
+    @classmethod
+    def build(cls, directory, index_path):
+        """
+        Build an index from the built-in lists and the word-list files.
+
+        Words are lower-cased; entries that are not plain letters a-z
+        (phrases, hyphenated or accented words) are skipped.
+
+        :param directory: Directory of "<category>.txt" files.
+        :param index_path: Path of the index to write.
+        """
+        categories = {category: set(words) for category, words in BUILTIN_WORDS.items()}
+        for category, path in cls.sources(directory):
+            words = categories.setdefault(category, set())
+            with open(path, encoding="utf-8", errors="replace") as file:
+                for line in file:
+                    word = line.strip().lower()
+                    if cls.WORD.fullmatch(word):
+                        words.add(word)
+
+        # Words of a bucket are stored together and sorted by length, then alphabetically
+        ordered = []
+        table = []
+        for category in sorted(categories):
+            grouped = {}
+            for word in categories[category]:
+                bucket = cls.bucket_of(word)
+                if bucket is not None:
+                    grouped.setdefault(bucket, []).append(word)
+            for bucket in WORD_LENGTHS:
+                words = sorted(grouped.get(bucket, []), key=lambda word: (len(word), word))
+                table.append([category, bucket, len(ordered), len(ordered) + len(words)])
+                ordered.extend(words)
+
+        offsets = array("I", [0])
+        for word in ordered:
+            offsets.append(offsets[-1] + len(word))
+        table = json.dumps(table).encode()
+        table += b" " * (-len(table) % 4)  # Keep the offset table aligned
+        with open(index_path + ".tmp", "wb") as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.source_digest(directory), len(ordered), len(table)))
+            file.write(table)
+            file.write(offsets.tobytes())
+            file.write("".join(ordered).encode("ascii"))
+        os.replace(index_path + ".tmp", index_path)
+
+    @classmethod
+    def load(cls, directory=WORD_LIST_DIR, index_path=WORD_INDEX_PATH):
+        """
+        Open the word bank index, building it first if it is missing or stale.
+
+        :param directory: Directory of "<category>.txt" files.
+        :param index_path: Path of the index.
+        :return: A WordBank.
+        """
+        digest = cls.source_digest(directory)
+        try:
+            bank = cls(index_path)
+            if bank.digest == digest:
+                return bank
+        except (OSError, ValueError, struct.error):
+            pass
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        cls.build(directory, index_path)
+        return cls(index_path)
+
+    def __len__(self):
+        return self.count
+
+    def word(self, i):
+        """
+        Get a word by its position in the index.
+
+        :param i: Position of the word.
+        :return: The word.
+        """
+        return self._map[self._data_start + self._offsets[i]:self._data_start + self._offsets[i + 1]].decode("ascii")
+
+    def categories(self):
+        """
+        List the categories in the index.
+
+        :return: A sorted list of category names.
+        """
+        return sorted({category for category, _ in self.buckets})
+
+    def size(self, category, bucket):
+        """
+        Count the words of a category in a word-length bucket.
+
+        :param category: The category name.
+        :param bucket: The bucket name (see WORD_LENGTHS).
+        :return: The number of words.
+        """
+        first, last = self.buckets.get((category, bucket), (0, 0))
+        return last - first
+
+    def length_range(self, category, length):
+        """
+        Find the words of a category that have a given length.
+
+        Buckets are sorted by length, so the words form one contiguous range.
+
+        :param category: The category name.
+        :param length: The word length.
+        :return: A tuple (first, last) of index positions; empty if there are none.
+        """
+        first, last = self.buckets.get((category, self.bucket_of("a" * length)), (0, 0))
+        lo, hi = first, last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._offsets[mid + 1] - self._offsets[mid] < length:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+        hi = last
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._offsets[mid + 1] - self._offsets[mid] <= length:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def letters(self, first, last, length):
+        """
+        View a range of equally long words as a matrix of letters, without copying.
+
+        :param first: Position of the first word.
+        :param last: Position after the last word.
+        :param length: The length of every word in the range.
+        :return: A read-only numpy uint8 array of ASCII codes shaped (last - first, length).
+        """
+        import numpy as np
+        return np.frombuffer(
+            self._map, dtype=np.uint8, count=(last - first) * length, offset=self._data_start + self._offsets[first]
+        ).reshape(last - first, length)
+
+    def choice(self, category, bucket, rng=random):
+        """
+        Pick a random word of a category in a word-length bucket.
+
+        :param category: The category name.
+        :param bucket: The bucket name (see WORD_LENGTHS).
+        :param rng: Random number generator to draw from.
+        :return: The word, or None if the bucket is empty.
+        """
+        first, last = self.buckets.get((category, bucket), (0, 0))
+        if first == last:
+            return None
+        return self.word(rng.randrange(first, last))
+
+class HangmanGame:
+    # Outcomes of a guess
+    INVALID = "invalid"
+    REPEATED = "repeated"
+    HIT = "hit"
+    MISS = "miss"
+    OVER = "over"
+
+    __slots__ = ("word", "attempts_left", "score", "guessed", "revealed")
+
+    def __init__(self, word, max_attempts):
+        """
+        Initialize the state of one game of Hangman.
+
+        Guessed letters and revealed positions are kept as bitmasks (bit 0
+        for "a", bit i for position i), so a game is a handful of ints.
+
+        :param word: The secret word, lower-case letters a-z.
+        :param max_attempts: Number of wrong guesses allowed.
+        """
+        self.word = word
+        self.attempts_left = max_attempts
+        self.score = 0
+        self.guessed = 0
+        self.revealed = 0
+
+    @classmethod
+    def start(cls, word_bank, category, difficulty, rng=random):
+        """
+        Start a game with a random word of a category and difficulty.
+
+        :param word_bank: WordBank to pick the word from.
+        :param category: The category name.
+        :param difficulty: A key of DIFFICULTIES.
+        :param rng: Random number generator to draw from.
+        :return: A HangmanGame, or None if there is no word for the combination.
+        """
+        settings = DIFFICULTIES[difficulty]
+        word = word_bank.choice(category, settings["word_length"], rng)
+        if word is None:
+            return None
+        return cls(word, settings["max_attempts"])
+
+    def guess(self, letter):
+        """
+        Apply a guess.
+
+        :param letter: The guessed letter.
+        :return: One of HIT, MISS, REPEATED, INVALID (not a single letter a-z) or OVER (the game has ended).
+        """
+        if self.over:
+            return self.OVER
+        if len(letter) != 1 or not "a" <= letter <= "z":
+            return self.INVALID
+        bit = 1 << (ord(letter) - ord("a"))
+        if self.guessed & bit:
+            return self.REPEATED
+        self.guessed |= bit
+
+        positions = 0
+        i = self.word.find(letter)
+        while i >= 0:
+            positions |= 1 << i
+            i = self.word.find(letter, i + 1)
+        if positions:
+            self.revealed |= positions
+            self.score += HIT_POINTS
+            return self.HIT
+        self.attempts_left -= 1
+        self.score += MISS_POINTS
+        return self.MISS
+
+    @property
+    def won(self):
+        return self.revealed == (1 << len(self.word)) - 1
+
+    @property
+    def lost(self):
+        return self.attempts_left <= 0 and not self.won
+
+    @property
+    def over(self):
+        return self.won or self.attempts_left <= 0
+
+    def pattern(self):
+        """
+        Get the word as the player sees it.
+
+        :return: A list with the revealed letters and "_" for hidden positions.
+        """
+        return [letter if self.revealed >> i & 1 else "_" for i, letter in enumerate(self.word)]
+
+    def guessed_letters(self):
+        """
+        Get the letters guessed so far.
+
+        :return: A set of letters.
+        """
+        return {chr(ord("a") + i) for i in range(26) if self.guessed >> i & 1}
+
 
 class HangmanGUI:
     def __init__(self, root):
@@ -9,28 +395,22 @@ class HangmanGUI:
         
         :param root: The root window of the application.
         """
+        load_gui()
         self.root = root
         self.root.title("Hangman Game")
         self.root.geometry("500x400")
 
-        # Word categories and difficulty levels
-        self.categories = {
-            "animals": ["elephant", "giraffe", "kangaroo", "penguin", "dolphin"],
-            "countries": ["canada", "brazil", "japan", "germany", "australia"],
-            "programming": ["python", "javascript", "algorithm", "function", "variable"]
-        }
-        self.difficulties = {
-            "easy": {"max_attempts": 8, "word_length": "short"},
-            "medium": {"max_attempts": 6, "word_length": "medium"},
-            "hard": {"max_attempts": 4, "word_length": "long"}
-        }
+        # Word categories and difficulty levels; word_length names a bucket in WORD_LENGTHS
+        self.word_bank = WordBank.load()
+        self.categories = self.word_bank.categories()
+        from Hangman_solver import HangmanSolver  # Imported here, as it needs numpy
+        self.solver = HangmanSolver(self.word_bank)
+        self.difficulties = DIFFICULTIES
 
-        # Initialize game variables
-        self.secret_word = ""
-        self.guessed_letters = set()
-        self.attempts_left = 0
-        self.score = 0
-        self.current_state = []
+        # Initialize game variables; the rules live in HangmanGame
+        self.category = None
+        self.auto_playing = False
+        self.game = None
 
         # GUI Elements
         self.category_var = tk.StringVar(value="animals")
@@ -47,7 +427,7 @@ class HangmanGUI:
         menu_frame.pack(pady=10)
 
         tk.Label(menu_frame, text="Choose Category:").grid(row=0, column=0, padx=5)
-        self.category_menu = tk.OptionMenu(menu_frame, self.category_var, *self.categories.keys())
+        self.category_menu = tk.OptionMenu(menu_frame, self.category_var, *self.categories)
         self.category_menu.grid(row=0, column=1, padx=5)
 
         tk.Label(menu_frame, text="Choose Difficulty:").grid(row=1, column=0, padx=5)
@@ -75,9 +455,19 @@ class HangmanGUI:
         self.guess_entry = tk.Entry(self.game_frame, font=("Arial", 14))
         self.guess_entry.pack(pady=10)
 
-        self.guess_button = tk.Button(self.game_frame, text="Guess", command=self.process_guess)
+        self.guess_button = tk.Button(self.game_frame, text="Guess", command=self.process_guess, state=tk.DISABLED)
         self.guess_button.pack()
 
+        self.hint_label = tk.Label(self.game_frame, text="", font=("Arial", 12))
+        self.hint_label.pack()
+
+        helper_frame = tk.Frame(self.game_frame)
+        helper_frame.pack(pady=5)
+        self.hint_button = tk.Button(helper_frame, text="Hint", command=self.show_hint, state=tk.DISABLED)
+        self.hint_button.pack(side=tk.LEFT, padx=5)
+        self.auto_button = tk.Button(helper_frame, text="Auto-play", command=self.auto_play, state=tk.DISABLED)
+        self.auto_button.pack(side=tk.LEFT, padx=5)
+
         self.restart_button = tk.Button(self.game_frame, text="Restart", command=self.restart_game, state=tk.DISABLED)
         self.restart_button.pack(pady=10)
 
@@ -88,78 +478,100 @@ class HangmanGUI:
         category = self.category_var.get()
         difficulty = self.difficulty_var.get()
 
-        # Filter words based on difficulty
-        word_list = self.categories[category]
-        if difficulty == "easy":
-            word_list = [word for word in word_list if len(word) <= 4]
-        elif difficulty == "medium":
-            word_list = [word for word in word_list if 5 <= len(word) <= 7]
-        elif difficulty == "hard":
-            word_list = [word for word in word_list if len(word) >= 8]
+        # Pick a word of the difficulty's length straight from the index
+        game = HangmanGame.start(self.word_bank, category, difficulty)
 
         # Check if the word list is empty
-        if not word_list:
+        if game is None:
             messagebox.showwarning("No Words Available", f"No words found for the selected category and difficulty. Please choose a different combination.")
             return
 
-        self.secret_word = random.choice(word_list)
-        self.attempts_left = self.difficulties[difficulty]["max_attempts"]
-        self.score = 0
-        self.guessed_letters = set()
-        self.current_state = ['_' for _ in self.secret_word]
+        self.game = game
+        self.category = category
+        self.auto_playing = False
 
         self.update_ui()
         self.guess_button.config(state=tk.NORMAL)
+        self.hint_button.config(state=tk.NORMAL)
+        self.auto_button.config(state=tk.NORMAL)
         self.restart_button.config(state=tk.DISABLED)
 
     def update_ui(self):
         """
         Update the game UI to reflect the current state.
         """
-        self.word_label.config(text=" ".join(self.current_state))
-        self.attempts_label.config(text=f"Attempts Left: {self.attempts_left}")
-        self.score_label.config(text=f"Score: {self.score}")
+        self.word_label.config(text=" ".join(self.game.pattern()))
+        self.attempts_label.config(text=f"Attempts Left: {self.game.attempts_left}")
+        self.score_label.config(text=f"Score: {self.game.score}")
+        self.hint_label.config(text="")
         self.guess_entry.delete(0, tk.END)
 
+    def show_hint(self):
+        """
+        Suggest the most informative next letter and put it in the guess field.
+
+        :return: The suggested letter, or None if there is nothing left to guess.
+        """
+        letter, count = self.solver.hint(self.category, self.game.pattern(), self.game.guessed_letters())
+        if letter is None:
+            return None
+        self.hint_label.config(text=f"Hint: try '{letter}' ({count} possible words)")
+        self.guess_entry.delete(0, tk.END)
+        self.guess_entry.insert(0, letter)
+        return letter
+
+    def auto_play(self, delay=400):
+        """
+        Let the solver play the rest of the game, one guess every delay milliseconds.
+
+        :param delay: Milliseconds between guesses.
+        """
+        self.auto_playing = True
+        self.auto_button.config(state=tk.DISABLED)
+        self.auto_step(delay)
+
+    def auto_step(self, delay):
+        if not self.auto_playing:
+            return
+        if self.show_hint() is None:
+            self.auto_playing = False
+            return
+        self.process_guess()
+        if self.auto_playing:
+            self.root.after(delay, self.auto_step, delay)
+
     def process_guess(self):
         """
         Process the player's guess and update the game state.
         """
         guess = self.guess_entry.get().lower()
+        result = self.game.guess(guess)
 
-        if len(guess) != 1 or not guess.isalpha():
+        if result == HangmanGame.INVALID:
             messagebox.showwarning("Invalid Input", "Please enter a single valid letter.")
             return
 
-        if guess in self.guessed_letters:
+        if result == HangmanGame.REPEATED:
             messagebox.showinfo("Already Guessed", f"You've already guessed '{guess}'. Try a different letter.")
             return
 
-        self.guessed_letters.add(guess)
-
-        if guess in self.secret_word:
-            for i, letter in enumerate(self.secret_word):
-                if letter == guess:
-                    self.current_state[i] = guess
-            self.score += 10
-        else:
-            self.attempts_left -= 1
-            self.score -= 5
-
         self.update_ui()
 
-        if '_' not in self.current_state:
-            messagebox.showinfo("Congratulations!", f"You've guessed the word: {self.secret_word}\nFinal Score: {self.score}")
+        if self.game.won:
+            messagebox.showinfo("Congratulations!", f"You've guessed the word: {self.game.word}\nFinal Score: {self.game.score}")
             self.end_game()
-        elif self.attempts_left <= 0:
-            messagebox.showinfo("Game Over", f"You've run out of attempts. The word was: {self.secret_word}\nFinal Score: {self.score}")
+        elif self.game.lost:
+            messagebox.showinfo("Game Over", f"You've run out of attempts. The word was: {self.game.word}\nFinal Score: {self.game.score}")
             self.end_game()
 
     def end_game(self):
         """
         End the game and disable the guess button.
         """
+        self.auto_playing = False
         self.guess_button.config(state=tk.DISABLED)
+        self.hint_button.config(state=tk.DISABLED)
+        self.auto_button.config(state=tk.DISABLED)
         self.restart_button.config(state=tk.NORMAL)
 
     def restart_game(self):
@@ -169,6 +581,7 @@ class HangmanGUI:
         self.start_game()
 
 if __name__ == "__main__":
+    load_gui()
     root = tk.Tk()
     game = HangmanGUI(root)
     root.mainloop()
\ No newline at end of file
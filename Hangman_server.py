@@ -0,0 +1,423 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+from urllib.parse import parse_qs, urlsplit
+from Hangman_game import DIFFICULTIES, WORD_INDEX_PATH, WORD_LIST_DIR, HangmanGame, WordBank
+from Http_protocol import BadRequest, latency_summary, read_request, send_request, write_response
+
+class ServerGame(HangmanGame):
+    __slots__ = ("player", "board", "last_active")
+
+    def __init__(self, word, max_attempts, player, board):
+        """
+        Initialize a game hosted by the server.
+
+        On top of the engine's bitmask state a hosted game only keeps its
+        player, its leaderboard key (a shared string) and when it was last
+        played.
+
+        :param word: The secret word.
+        :param max_attempts: Number of wrong guesses allowed.
+        :param player: Name of the player.
+        :param board: Leaderboard key "category/difficulty".
+        """
+        super().__init__(word, max_attempts)
+        self.player = player
+        self.board = board
+        self.last_active = time.monotonic()
+
+class Leaderboard:
+    def __init__(self):
+        """
+        Initialize a leaderboard of total scores that is updated as games finish.
+
+        Players are kept in a list sorted by score, so recording a game is
+        two binary searches and one list move, and the top entries or a
+        player's rank are read without sorting.
+        """
+        self.totals = {}   # player -> [score, wins, games]
+        self.ranking = []  # (-score, player), best first
+
+    def record(self, player, score, won):
+        """
+        Add a finished game to a player's totals.
+
+        :param player: Name of the player.
+        :param score: Final score of the game.
+        :param won: True if the player found the word.
+        """
+        totals = self.totals.get(player)
+        if totals is None:
+            totals = self.totals[player] = [0, 0, 0]
+        else:
+            del self.ranking[bisect_left(self.ranking, (-totals[0], player))]
+        totals[0] += score
+        totals[1] += won
+        totals[2] += 1
+        insort(self.ranking, (-totals[0], player))
+
+    def top(self, limit=10):
+        """
+        Get the best players.
+
+        :param limit: Number of players.
+        :return: A list of dictionaries with rank, player, score, wins and games.
+        """
+        return [
+            {"rank": rank, "player": player, "score": -negative, "wins": self.totals[player][1], "games": self.totals[player][2]}
+            for rank, (negative, player) in enumerate(self.ranking[:limit], start=1)
+        ]
+
+    def rank(self, player):
+        """
+        Get a player's position.
+
+        :param player: Name of the player.
+        :return: The 1-based rank, or None if the player has not finished a game.
+        """
+        totals = self.totals.get(player)
+        if totals is None:
+            return None
+        return bisect_left(self.ranking, (-totals[0], player)) + 1
+
+class HangmanServer:
+    def __init__(self, word_bank, host="127.0.0.1", port=8766, idle_timeout=1800):
+        """
+        Initialize a server that hosts many concurrent Hangman games.
+
+        Every game lives on one asyncio event loop; a guess is a few bit
+        operations, so nothing is handed to threads.
+
+        :param word_bank: WordBank the secret words come from.
+        :param host: Interface to listen on.
+        :param port: Port to listen on.
+        :param idle_timeout: Seconds after which an abandoned game is dropped.
+        """
+        self.word_bank = word_bank
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.games = {}  # game id -> ServerGame
+        self.next_id = 1
+        self.boards = {"all": Leaderboard()}
+        self.connections = 0
+        self.guesses = 0
+        self.finished = 0
+        self.expired = 0
+
+    def new_game(self, player, category, difficulty):
+        """
+        Start a game.
+
+        :param player: Name of the player.
+        :param category: The category name.
+        :param difficulty: A key of DIFFICULTIES.
+        :return: A tuple (game id, ServerGame), or None if there is no word for the combination.
+        """
+        settings = DIFFICULTIES[difficulty]
+        word = self.word_bank.choice(category, settings["word_length"])
+        if word is None:
+            return None
+        board = sys.intern(f"{category}/{difficulty}")  # One shared string per board
+        if board not in self.boards:
+            self.boards[board] = Leaderboard()
+        game_id = self.next_id
+        self.next_id += 1
+        game = self.games[game_id] = ServerGame(word, settings["max_attempts"], player, board)
+        return game_id, game
+
+    def guess(self, game_id, letter):
+        """
+        Apply a guess and update the leaderboards when the game ends.
+
+        :param game_id: The game's id.
+        :param letter: The guessed letter.
+        :return: A tuple (game, result), or None if there is no such game.
+        """
+        game = self.games.get(game_id)
+        if game is None:
+            return None
+        result = game.guess(letter)
+        game.last_active = time.monotonic()
+        self.guesses += 1
+        if game.over:
+            del self.games[game_id]
+            self.finished += 1
+            won = game.won
+            self.boards["all"].record(game.player, game.score, won)
+            self.boards[game.board].record(game.player, game.score, won)
+        return game, result
+
+    @staticmethod
+    def describe(game_id, game):
+        """
+        Get the public state of a game; the word is only revealed once the game is over.
+
+        :param game_id: Id of the game.
+        :param game: The ServerGame.
+        :return: A JSON-serializable dictionary.
+        """
+        state = {
+            "game": game_id,
+            "pattern": "".join(game.pattern()),
+            "attempts_left": game.attempts_left,
+            "score": game.score,
+            "over": game.over
+        }
+        if game.over:
+            state["won"] = game.won
+            state["word"] = game.word
+        return state
+
+    def stats(self):
+        """
+        Get server counters.
+
+        :return: A dictionary of counters, including the resident memory of the process.
+        """
+        return {
+            "active_games": len(self.games),
+            "finished_games": self.finished,
+            "expired_games": self.expired,
+            "guesses": self.guesses,
+            "players": len(self.boards["all"].totals),
+            "connections": self.connections,
+            "rss_bytes": resident_memory()
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serve the requests of one keep-alive connection.
+
+        :param reader: asyncio StreamReader of the connection.
+        :param writer: asyncio StreamWriter of the connection.
+        """
+        self.connections += 1
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload = self.route(method, urlsplit(target), body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except BadRequest as e:
+            write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def route(self, method, url, body):
+        """
+        Answer one HTTP request.
+
+        :param method: HTTP method.
+        :param url: Request target split by urllib.parse.urlsplit.
+        :param body: Request body as bytes.
+        :return: A tuple (status, payload) with the JSON-serializable response.
+        """
+        try:
+            if method == "POST" and url.path in ("/guess", "/games"):
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    return 400, {"error": "Body must be a JSON object."}
+            if method == "POST" and url.path == "/guess":
+                game_id = int(data.get("game", 0))
+                played = self.guess(game_id, str(data.get("letter", "")).lower())
+                if played is None:
+                    return 404, {"error": "No such game; it may have finished or expired."}
+                game, result = played
+                return 200, {"result": result, **self.describe(game_id, game)}
+            if method == "POST" and url.path == "/games":
+                difficulty = data.get("difficulty", "medium")
+                if not data.get("player") or difficulty not in DIFFICULTIES:
+                    return 400, {"error": f"Expected JSON with 'player', 'category' and a difficulty in {list(DIFFICULTIES)}."}
+                started = self.new_game(str(data["player"]), str(data.get("category", "animals")), difficulty)
+                if started is None:
+                    return 400, {"error": "No words found for the selected category and difficulty."}
+                return 200, self.describe(*started)
+            if method == "GET" and url.path.startswith("/games/"):
+                game_id = int(url.path[len("/games/"):])
+                game = self.games.get(game_id)
+                if game is None:
+                    return 404, {"error": "No such game; it may have finished or expired."}
+                return 200, self.describe(game_id, game)
+            if method == "GET" and url.path == "/leaderboard":
+                query = parse_qs(url.query)
+                board = self.boards.get(query.get("board", ["all"])[0])
+                if board is None:
+                    return 404, {"error": f"No leaderboard; choose one of {sorted(self.boards)}."}
+                player = query.get("player", [None])[0]
+                return 200, {
+                    "top": board.top(int(query.get("limit", ["10"])[0])),
+                    "rank": board.rank(player) if player else None
+                }
+            if method == "GET" and url.path == "/stats":
+                return 200, self.stats()
+            return 404, {"error": f"No route for {method} {url.path}"}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return 400, {"error": "Body is not valid JSON."}
+        except (TypeError, ValueError, OverflowError):
+            return 400, {"error": "Game ids and limits must be integers."}
+
+    async def expire_games(self):
+        """
+        Drop games left idle for longer than idle_timeout, once a minute until cancelled.
+        """
+        while True:
+            await asyncio.sleep(60)
+            cutoff = time.monotonic() - self.idle_timeout
+            idle = [game_id for game_id, game in self.games.items() if game.last_active < cutoff]
+            for game_id in idle:
+                del self.games[game_id]
+            self.expired += len(idle)
+
+    async def serve(self):
+        """
+        Serve until cancelled.
+        """
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=4096)
+        print(f"Hangman server listening on {self.host}:{self.port}", file=sys.stderr)
+        expiry = asyncio.create_task(self.expire_games())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+
+
+def resident_memory():
+    """
+    Get the resident memory of this process.
+
+    :return: Bytes in RAM, or None where it cannot be read.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+async def load_test(host, port, connections, games, category, difficulty):
+    """
+    Hold many games open at once, then play them all to the end.
+
+    Every game is started before the first guess, so the server's memory
+    growth divided by the number of games is the memory per active game.
+    Guesses follow English letter frequency.
+
+    :param host: Server host.
+    :param port: Server port.
+    :param connections: Number of concurrent keep-alive connections.
+    :param games: Total number of games, spread over the connections.
+    :param category: Category of every game.
+    :param difficulty: Difficulty of every game.
+    :return: A dictionary with memory per game, guesses per second and latency percentiles.
+    """
+    from Hangman_solver import FALLBACK_ORDER  # Imported here, so serving does not load numpy
+    latencies = []
+    errors = 0
+
+    async def call(reader, writer, method, path, payload=None):
+        status, body = await send_request(reader, writer, host, method, path, payload)
+        return status == 200, json.loads(body)
+
+    async def stats():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            return (await call(reader, writer, "GET", "/stats"))[1]
+        finally:
+            writer.close()
+
+    opened = [await asyncio.open_connection(host, port) for _ in range(connections)]
+    before = await stats()
+
+    async def start_games(n, reader, writer):
+        nonlocal errors
+        ids = []
+        for i in range(n, games, connections):
+            ok, data = await call(reader, writer, "POST", "/games", {"player": f"player-{i % 1000}", "category": category, "difficulty": difficulty})
+            if ok:
+                ids.append(data["game"])
+            else:
+                errors += 1
+        return ids
+
+    started = await asyncio.gather(*(start_games(n, *opened[n]) for n in range(connections)))
+    during = await stats()
+
+    async def play(ids, reader, writer):
+        nonlocal errors
+        # Guess round-robin across the connection's games, so they all stay active until the end
+        progress = {game_id: 0 for game_id in ids}
+        while progress:
+            for game_id in list(progress):
+                letter = FALLBACK_ORDER[progress[game_id]]
+                progress[game_id] += 1
+                start = time.perf_counter()
+                ok, data = await call(reader, writer, "POST", "/guess", {"game": game_id, "letter": letter})
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+                if not ok or data["over"]:
+                    del progress[game_id]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play(ids, *opened[n]) for n, ids in enumerate(started)))
+    elapsed = time.perf_counter() - start
+    for _, writer in opened:
+        writer.close()
+    after = await stats()
+
+    active = during["active_games"] - before["active_games"]
+    grown = during["rss_bytes"] - before["rss_bytes"] if during["rss_bytes"] is not None else None
+    return {
+        "connections": connections,
+        "games": active,
+        "guesses": len(latencies),
+        "errors": errors,
+        "bytes_per_active_game": grown / active if grown is not None and active else None,
+        "seconds": elapsed,
+        "guesses_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        **latency_summary(latencies),
+        "finished_games": after["finished_games"] - before["finished_games"]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-player Hangman server and load generator.")
+    parser.add_argument("mode", choices=["serve", "loadtest"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--words", default=WORD_LIST_DIR, help="serve: directory of <category>.txt word lists")
+    parser.add_argument("--idle-timeout", type=float, default=1800, help="serve: seconds before an abandoned game is dropped")
+    parser.add_argument("--connections", type=int, default=100, help="load test: concurrent connections")
+    parser.add_argument("--games", type=int, default=20000, help="load test: games held open at once")
+    parser.add_argument("--category", default="animals", help="load test: category of the games")
+    parser.add_argument("--difficulty", default="medium", choices=list(DIFFICULTIES), help="load test: difficulty of the games")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        server = HangmanServer(WordBank.load(args.words, WORD_INDEX_PATH), args.host, args.port, args.idle_timeout)
+        try:
+            asyncio.run(server.serve())
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(load_test(args.host, args.port, args.connections, args.games, args.category, args.difficulty))
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,296 @@
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from Hangman_game import DIFFICULTIES, HIT_POINTS, MISS_POINTS, WORD_INDEX_PATH, WORD_LIST_DIR, HangmanGame, WordBank
+from Hangman_solver import FALLBACK_ORDER, HangmanSolver
+
+# Wrong guesses allowed while simulating; more than any word can need, so every game is played to the end
+UNLIMITED_ATTEMPTS = 26
+
+class FrequencyStrategy:
+    def __init__(self, word_bank, category, rng):
+        """
+        Initialize a strategy that guesses letters in order of English frequency.
+
+        :param word_bank: WordBank the words come from.
+        :param category: The category being played.
+        :param rng: Random number generator of the simulation.
+        """
+        self.order = [(letter, 1 << (ord(letter) - ord("a"))) for letter in FALLBACK_ORDER]
+
+    def guess(self, game):
+        """
+        Choose the next letter.
+
+        :param game: The HangmanGame being played.
+        :return: A letter that has not been guessed yet.
+        """
+        for letter, bit in self.order:
+            if not game.guessed & bit:
+                return letter
+
+class RandomStrategy:
+    def __init__(self, word_bank, category, rng):
+        """
+        Initialize a strategy that guesses unguessed letters at random.
+
+        :param word_bank: WordBank the words come from.
+        :param category: The category being played.
+        :param rng: Random number generator of the simulation.
+        """
+        self.rng = rng
+
+    def guess(self, game):
+        """
+        Choose the next letter.
+
+        :param game: The HangmanGame being played.
+        :return: A letter that has not been guessed yet.
+        """
+        return self.rng.choice([chr(ord("a") + i) for i in range(26) if not game.guessed >> i & 1])
+
+class SolverStrategy:
+    def __init__(self, word_bank, category, rng):
+        """
+        Initialize a strategy that follows the hint engine.
+
+        :param word_bank: WordBank the words come from.
+        :param category: The category being played.
+        :param rng: Random number generator of the simulation.
+        """
+        self.solver = HangmanSolver(word_bank)
+        self.category = category
+
+    def guess(self, game):
+        """
+        Choose the next letter.
+
+        :param game: The HangmanGame being played.
+        :return: A letter that has not been guessed yet.
+        """
+        return self.solver.hint(self.category, game.pattern(), game.guessed_letters())[0]
+
+# Strategies available by name; others can be given as "module:Class"
+STRATEGIES = {
+    "frequency": FrequencyStrategy,
+    "random": RandomStrategy,
+    "solver": SolverStrategy
+}
+
+def load_strategy(name):
+    """
+    Find a strategy class by name.
+
+    :param name: A key of STRATEGIES, or "module:Class" for a class with the same interface.
+    :return: The strategy class.
+    """
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown strategy {name!r}; use one of {sorted(STRATEGIES)} or module:Class")
+    return getattr(importlib.import_module(module), attribute)
+
+def outcome(moves, max_attempts):
+    """
+    Score a game as if it had been played with a given number of attempts.
+
+    :param moves: The guesses of a finished game as a string of "h" (hit) and "m" (miss).
+    :param max_attempts: Number of wrong guesses allowed.
+    :return: A tuple (won, score).
+    """
+    misses = 0
+    for i, move in enumerate(moves):
+        if move == "m":
+            misses += 1
+            if misses == max_attempts:
+                hits = i + 1 - misses
+                return False, hits * HIT_POINTS + misses * MISS_POINTS
+    return True, (len(moves) - misses) * HIT_POINTS + misses * MISS_POINTS
+
+_word_bank = None
+
+def simulate(task):
+    """
+    Play a chunk of games of one category, difficulty and strategy.
+
+    Each game is played until the word is found, and its guesses are
+    then scored for the difficulty's max_attempts. Counting how many
+    misses each word took also gives the win rate for any other limit.
+
+    :param task: Tuple (category, difficulty, strategy name, games, seed, word directory, index path).
+    :return: A dictionary of counters for the chunk.
+    """
+    global _word_bank
+    category, difficulty, strategy_name, games, seed, directory, index_path = task
+    if _word_bank is None:
+        _word_bank = WordBank.load(directory, index_path)
+    rng = random.Random(seed)
+    strategy = load_strategy(strategy_name)(_word_bank, category, rng)
+    bucket = DIFFICULTIES[difficulty]["word_length"]
+    max_attempts = DIFFICULTIES[difficulty]["max_attempts"]
+
+    wins = 0
+    scores = Counter()
+    misses_to_solve = Counter()
+    games_by_length = Counter()
+    wins_by_length = Counter()
+    for _ in range(games):
+        word = _word_bank.choice(category, bucket, rng)
+        if word is None:
+            break
+        game = HangmanGame(word, UNLIMITED_ATTEMPTS)
+        moves = []
+        while not game.won:
+            letter = strategy.guess(game)
+            result = game.guess(letter)
+            if result not in (HangmanGame.HIT, HangmanGame.MISS):
+                # Neither uses up an attempt, so the game would never end
+                raise ValueError(f"Strategy {strategy_name!r} made a {result} guess {letter!r}")
+            moves.append("h" if result == HangmanGame.HIT else "m")
+        won, score = outcome(moves, max_attempts)
+        wins += won
+        scores[score] += 1
+        misses_to_solve[moves.count("m")] += 1
+        games_by_length[len(word)] += 1
+        wins_by_length[len(word)] += won
+    return {
+        "games": sum(games_by_length.values()),
+        "wins": wins,
+        "scores": scores,
+        "misses_to_solve": misses_to_solve,
+        "games_by_length": games_by_length,
+        "wins_by_length": wins_by_length
+    }
+
+def percentile(distribution, fraction):
+    """
+    Find a percentile of a value distribution.
+
+    :param distribution: Counter of value -> occurrences.
+    :param fraction: The percentile as a fraction (0.5 for the median).
+    :return: The value, or None if the distribution is empty.
+    """
+    total = sum(distribution.values())
+    seen = 0
+    for value in sorted(distribution):
+        seen += distribution[value]
+        if seen >= fraction * total:
+            return value
+    return None
+
+def summarize(category, difficulty, strategy, chunks, max_attempts_range=range(1, 13)):
+    """
+    Combine the chunks of one combination into a report entry.
+
+    :param category: The category name.
+    :param difficulty: The difficulty name.
+    :param strategy: The strategy name.
+    :param chunks: Dictionaries returned by simulate.
+    :param max_attempts_range: Limits to report the win rate for.
+    :return: A result dictionary.
+    """
+    totals = {key: Counter() for key in ("scores", "misses_to_solve", "games_by_length", "wins_by_length")}
+    games = wins = 0
+    for chunk in chunks:
+        games += chunk["games"]
+        wins += chunk["wins"]
+        for key, counter in totals.items():
+            counter.update(chunk[key])
+    misses = totals["misses_to_solve"]
+    return {
+        "category": category,
+        "difficulty": difficulty,
+        "strategy": strategy,
+        "games": games,
+        "max_attempts": DIFFICULTIES[difficulty]["max_attempts"],
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "mean_score": sum(score * count for score, count in totals["scores"].items()) / games if games else 0.0,
+        "score_percentiles": {f"p{int(q * 100)}": percentile(totals["scores"], q) for q in (0.1, 0.5, 0.9)},
+        "score_distribution": {str(score): totals["scores"][score] for score in sorted(totals["scores"])},
+        "misses_to_solve": {str(count): misses[count] for count in sorted(misses)},
+        "win_rate_by_max_attempts": {
+            str(limit): sum(n for count, n in misses.items() if count < limit) / games if games else 0.0
+            for limit in max_attempts_range
+        },
+        "win_rate_by_length": {
+            str(length): totals["wins_by_length"][length] / n for length, n in sorted(totals["games_by_length"].items())
+        }
+    }
+
+def run(categories, difficulties, strategies, games, workers, chunk_size, seed, directory, index_path):
+    """
+    Simulate every combination of category, difficulty and strategy across a process pool.
+
+    :param categories: Category names.
+    :param difficulties: Difficulty names.
+    :param strategies: Strategy names.
+    :param games: Games per combination.
+    :param workers: Number of worker processes.
+    :param chunk_size: Games per task sent to a worker.
+    :param seed: Seed of the simulation; the same seed replays the same games.
+    :param directory: Directory of "<category>.txt" word lists.
+    :param index_path: Path of the word bank index.
+    :return: The report dictionary.
+    """
+    WordBank.load(directory, index_path)  # Build the index once, before the workers open it
+    combinations = [(c, d, s) for c in categories for d in difficulties for s in strategies]
+    tasks = []
+    for category, difficulty, strategy in combinations:
+        for chunk, first in enumerate(range(0, games, chunk_size)):
+            chunk_seed = f"{seed}:{category}:{difficulty}:{strategy}:{chunk}"
+            tasks.append((category, difficulty, strategy, min(chunk_size, games - first), chunk_seed, directory, index_path))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(simulate, tasks))
+    seconds = time.perf_counter() - start
+
+    by_combination = {}
+    for task, chunk in zip(tasks, chunks):
+        by_combination.setdefault(task[:3], []).append(chunk)
+    played = sum(chunk["games"] for chunk in chunks)
+    return {
+        "parameters": {"games": games, "workers": workers, "chunk_size": chunk_size, "seed": seed},
+        "difficulties": DIFFICULTIES,
+        "seconds": seconds,
+        "games_per_second": played / seconds if seconds > 0 else 0.0,
+        "results": [summarize(*combination, by_combination.get(combination, [])) for combination in combinations]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate Hangman games to calibrate difficulties.")
+    parser.add_argument("--games", type=int, default=100000, help="games per category, difficulty and strategy")
+    parser.add_argument("--categories", nargs="+", help="categories to play (default: all)")
+    parser.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES), choices=list(DIFFICULTIES))
+    parser.add_argument("--strategies", nargs="+", default=["frequency"], help=f"any of {sorted(STRATEGIES)} or module:Class")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the simulation")
+    parser.add_argument("--words", default=WORD_LIST_DIR, help="directory of <category>.txt word lists")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    for name in args.strategies:
+        load_strategy(name)  # Fail early on a misspelled strategy
+    categories = args.categories or WordBank.load(args.words, WORD_INDEX_PATH).categories()
+    report = run(
+        categories, args.difficulties, args.strategies, args.games, args.workers,
+        args.chunk_size, args.seed, args.words, WORD_INDEX_PATH
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    print(f"{report['games_per_second']:.0f} games/s on {args.workers} workers", file=sys.stderr)
@@ -0,0 +1,184 @@
+import numpy as np
+
+# Letters ordered by frequency in English text, used when no candidate word is left
+FALLBACK_ORDER = "etaoinshrdlcumwfgypbvkjxqz"
+
+# Bit of each letter in a letter mask, indexed by ASCII code
+LETTER_BITS = np.zeros(256, dtype=np.uint32)
+LETTER_BITS[ord("a"):ord("z") + 1] = 1 << np.arange(26, dtype=np.uint32)
+
+def letter_mask(letters):
+    """
+    Turn letters into a bitmask with bit 0 for "a" through bit 25 for "z".
+
+    :param letters: Iterable of lower-case letters.
+    :return: The mask as an int.
+    """
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter) - ord("a"))
+    return mask
+
+class WordMatrix:
+    def __init__(self, letters):
+        """
+        Initialize the arrays the solver filters for words of one length.
+
+        :param letters: uint8 array of ASCII codes shaped (words, length).
+        """
+        self.letters = letters
+        self.length = letters.shape[1]
+        # Which letters each word contains, one bit per letter
+        self.masks = np.bitwise_or.reduce(LETTER_BITS[letters], axis=1) if len(letters) else np.zeros(0, dtype=np.uint32)
+        # Weights that turn the positions of a letter into a small integer key
+        self.weights = 1 << np.arange(self.length, dtype=np.int64) if self.length < 63 else None
+        self.opening = None  # Best first guess, computed once
+
+    def __len__(self):
+        return len(self.letters)
+
+class HangmanSolver:
+    def __init__(self, word_bank):
+        """
+        Initialize a hint engine over a word bank.
+
+        Candidate words are the words of the game's category and length that
+        agree with the revealed letters and contain no wrongly guessed
+        letter. They are filtered with numpy over the word bank's letter
+        matrices, and each guess only re-filters the candidates left by the
+        previous one.
+
+        :param word_bank: WordBank providing the words.
+        """
+        self.word_bank = word_bank
+        self._matrices = {}  # (category, length) -> WordMatrix
+        self._last = None    # (category, pattern, guessed letters, candidate indices) of the previous call
+
+    def matrix(self, category, length):
+        """
+        Get the word matrix of a category and word length, building it on first use.
+
+        :param category: The category name.
+        :param length: The word length.
+        :return: A WordMatrix.
+        """
+        key = (category, length)
+        matrix = self._matrices.get(key)
+        if matrix is None:
+            first, last = self.word_bank.length_range(category, length)
+            letters = self.word_bank.letters(first, last, length) if last > first else np.zeros((0, length), np.uint8)
+            matrix = self._matrices[key] = WordMatrix(letters)
+        return matrix
+
+    def candidates(self, category, pattern, guessed_letters):
+        """
+        Find the words consistent with a game state.
+
+        :param category: The category name.
+        :param pattern: The revealed word as a list of letters with "_" for hidden positions.
+        :param guessed_letters: Set of letters guessed so far.
+        :return: A tuple (WordMatrix, indices of the candidate words in it).
+        """
+        matrix = self.matrix(category, len(pattern))
+        guessed = letter_mask(guessed_letters)
+        indices = np.arange(len(matrix))
+        if self._last is not None:
+            last_category, last_pattern, last_guessed, last_indices = self._last
+            if last_category == category and self.refines(pattern, guessed_letters, last_pattern, last_guessed):
+                indices = last_indices
+
+        letters = matrix.letters[indices]
+        keep = np.ones(len(indices), dtype=bool)
+        hidden = []
+        for position, letter in enumerate(pattern):
+            if letter == "_":
+                hidden.append(position)
+            else:
+                keep &= letters[:, position] == ord(letter)
+        if hidden and guessed:
+            # A hidden position cannot hold a letter that was already guessed
+            keep &= ~(np.bitwise_or.reduce(LETTER_BITS[letters[:, hidden]], axis=1) & guessed).astype(bool)
+        indices = indices[keep]
+        self._last = (category, list(pattern), set(guessed_letters), indices)
+        return matrix, indices
+
+    @staticmethod
+    def refines(pattern, guessed_letters, last_pattern, last_guessed):
+        """
+        Check whether a game state can only follow from an earlier one.
+
+        If so, its candidates are a subset of the earlier state's, which
+        lets a later guess of the same game filter the previous candidates
+        instead of the whole dictionary.
+
+        :param pattern: The current revealed word.
+        :param guessed_letters: The current guessed letters.
+        :param last_pattern: The earlier revealed word.
+        :param last_guessed: The earlier guessed letters.
+        :return: True if the current state refines the earlier one.
+        """
+        if len(pattern) != len(last_pattern) or not last_guessed <= guessed_letters:
+            return False
+        for letter, last_letter in zip(pattern, last_pattern):
+            if last_letter != "_" and letter != last_letter:
+                return False
+            if last_letter == "_" and letter in last_guessed:
+                return False
+        return True
+
+    def best_letter(self, matrix, indices, guessed_letters):
+        """
+        Pick the unguessed letter whose answer tells the most about the word.
+
+        Each letter splits the candidates by the positions it would reveal
+        (none at all for a miss); the letter whose split has the highest
+        entropy wins, ties going to the letter most likely to be a hit.
+
+        :param matrix: WordMatrix of the candidates.
+        :param indices: Indices of the candidate words.
+        :param guessed_letters: Set of letters guessed so far.
+        :return: A letter, or None if every letter has been guessed.
+        """
+        unguessed = [letter for letter in FALLBACK_ORDER if letter not in guessed_letters]
+        if not len(indices):
+            return unguessed[0] if unguessed else None
+
+        letters = matrix.letters[indices]
+        masks = matrix.masks[indices]
+        total = len(indices)
+        best = None
+        for letter in unguessed:
+            hits = int(np.count_nonzero(masks & (1 << (ord(letter) - ord("a")))))
+            if hits == 0:
+                continue
+            if matrix.weights is None:
+                keys = np.packbits(letters == ord(letter), axis=1)
+                counts = np.unique(keys.view(np.dtype((np.void, keys.shape[1]))).ravel(), return_counts=True)[1]
+            else:
+                keys = (letters == ord(letter)).astype(np.int64) @ matrix.weights
+                # Short words have few position keys, so counting beats sorting
+                counts = np.bincount(keys) if matrix.length <= 16 else np.unique(keys, return_counts=True)[1]
+                counts = counts[counts > 0]
+            score = float(np.log2(total) - (counts * np.log2(counts)).sum() / total)
+            if best is None or (score, hits) > best[0]:
+                best = ((score, hits), letter)
+        if best is None:
+            return unguessed[0] if unguessed else None
+        return best[1]
+
+    def hint(self, category, pattern, guessed_letters):
+        """
+        Suggest the next letter for a game state.
+
+        :param category: The category name.
+        :param pattern: The revealed word as a list of letters with "_" for hidden positions.
+        :param guessed_letters: Set of letters guessed so far.
+        :return: A tuple (letter, number of candidate words left); letter is None if every letter was guessed.
+        """
+        matrix, indices = self.candidates(category, pattern, guessed_letters)
+        if not guessed_letters:
+            # The opening guess depends only on the word length, so it is computed once
+            if matrix.opening is None:
+                matrix.opening = self.best_letter(matrix, indices, guessed_letters)
+            return matrix.opening, len(indices)
+        return self.best_letter(matrix, indices, guessed_letters), len(indices)
@@ -0,0 +1,111 @@
+import itertools
+import json
+
+# Reason phrases of the statuses the servers send
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+# Largest request body and number of header lines accepted from a client
+MAX_BODY_SIZE = 1 << 20
+MAX_HEADERS = 100
+
+class BadRequest(ValueError):
+    """
+    Raised for a request that is refused before it is read in full; the
+    connection should get a 400 response and be closed.
+    """
+
+async def read_request(reader, max_body_size=MAX_BODY_SIZE):
+    """
+    Read one HTTP/1.1 request.
+
+    :param reader: asyncio StreamReader of the connection.
+    :param max_body_size: Largest body accepted, in bytes.
+    :return: A tuple (method, target, headers, body), or None when the client closed the connection.
+    :raises BadRequest: If the request has too many headers or too large a body.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    for count in itertools.count():
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        if count == MAX_HEADERS:
+            raise BadRequest(f"More than {MAX_HEADERS} headers.")
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest("Content-Length is not a number.")
+    if not 0 <= length <= max_body_size:
+        raise BadRequest(f"Body must be at most {max_body_size} bytes.")
+    body = await reader.readexactly(length)
+    return method, target, headers, body
+
+def write_response(writer, status, payload, keep_alive=True):
+    """
+    Write a JSON response.
+
+    :param writer: asyncio StreamWriter of the connection.
+    :param status: HTTP status code.
+    :param payload: Object sent as the JSON body.
+    :param keep_alive: Whether the connection stays open for another request.
+    """
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+    )
+
+async def send_request(reader, writer, host, method, path, payload=None):
+    """
+    Send a request over a keep-alive connection and read the response, for load tests.
+
+    :param reader: asyncio StreamReader of the connection.
+    :param writer: asyncio StreamWriter of the connection.
+    :param host: Value of the Host header.
+    :param method: HTTP method.
+    :param path: Request target.
+    :param payload: Optional object sent as the JSON body.
+    :return: A tuple (status, body) with the body as bytes.
+    """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    line = await reader.readline()
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        if header.lower().startswith(b"content-length:"):
+            length = int(header.split(b":")[1])
+    body = await reader.readexactly(length)
+    parts = line.split()
+    return int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0, body
+
+def latency_summary(latencies):
+    """
+    Summarize request latencies for a load test report.
+
+    :param latencies: Latencies in seconds, in any order.
+    :return: A dictionary with the 50th, 95th and 99th percentiles and the maximum, in milliseconds.
+    """
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0
+    }
@@ -0,0 +1,152 @@
+import sys
+import warnings
+import numpy as np
+from Stock_price_history import HistoryStore
+
+TRADING_DAYS = 252
+
+def simple_returns(closes):
+    """
+    Compute period-over-period returns for every column.
+
+    :param closes: Array of prices shaped (dates, symbols).
+    :return: Array of returns shaped (dates - 1, symbols); NaN where a price is missing.
+    """
+    return closes[1:] / closes[:-1] - 1
+
+def max_drawdown(values):
+    """
+    Compute the largest peak-to-trough decline of every column.
+
+    :param values: Array of prices or portfolio values shaped (dates, series).
+    :return: Array of drawdowns as negative fractions, one per series.
+    """
+    peaks = np.fmax.accumulate(values, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drawdowns = values / peaks - 1
+    return np.nanmin(drawdowns, axis=0)
+
+def series_stats(values, periods_per_year=TRADING_DAYS):
+    """
+    Compute total return, annualized volatility and maximum drawdown per column.
+
+    :param values: Array of prices or values shaped (dates, series).
+    :param periods_per_year: Number of periods used to annualize volatility.
+    :return: A dictionary of arrays keyed by statistic.
+    """
+    if len(values) == 0:
+        empty = np.full(values.shape[1], np.nan)
+        return {"total_return": empty, "volatility": empty, "max_drawdown": empty}
+
+    returns = simple_returns(values)
+    valid = ~np.isnan(values)
+    first = np.argmax(valid, axis=0)
+    last = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    columns = np.arange(values.shape[1])
+    # Symbols without enough history simply come out as NaN
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        total_return = values[last, columns] / values[first, columns] - 1
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(periods_per_year)
+        drawdown = max_drawdown(values)
+    return {
+        "total_return": total_return,
+        "volatility": volatility,
+        "max_drawdown": drawdown
+    }
+
+def correlation(returns):
+    """
+    Compute the correlation matrix of return series, each pair over the dates both have.
+
+    :param returns: Array of returns shaped (dates, symbols).
+    :return: Array shaped (symbols, symbols); NaN for pairs with fewer than two common dates.
+    """
+    valid = (~np.isnan(returns)).astype(np.float64)
+    values = np.where(valid > 0, returns, 0.0)
+    # Sums over the rows where both series of a pair have a value, for every pair at once
+    pairs = valid.T @ valid
+    sums = values.T @ valid            # sums[i, j]: sum of series i where j is also valid
+    squares = (values * values).T @ valid
+    products = values.T @ values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = products - sums * sums.T / pairs
+        variance = squares - sums * sums / pairs
+        result = covariance / np.sqrt(variance * variance.T)
+    result[pairs < 2] = np.nan
+    return np.clip(result, -1.0, 1.0)
+
+def analyze(store, symbols, shares, start=None, end=None):
+    """
+    Compute per-holding and portfolio analytics from cached price history.
+
+    The portfolio is valued with constant share counts from the first date
+    on which every priced holding has a close. Holdings without any close
+    in the range are left out of the portfolio series and listed under
+    "unpriced".
+
+    :param store: HistoryStore holding the series.
+    :param symbols: List of stock symbols.
+    :param shares: Share counts aligned with symbols.
+    :param start: Optional first date (inclusive).
+    :param end: Optional last date (inclusive).
+    :return: A dictionary with "holdings", "portfolio", "unpriced" and "correlation" entries.
+    """
+    dates, closes = store.closes(symbols, start, end)
+    holding = series_stats(closes)
+    priced = ~np.isnan(closes).all(axis=0)
+    complete = ~np.isnan(closes[:, priced]).any(axis=1)
+    values = closes[np.argmax(complete):, priced] if complete.any() else np.full((0, priced.sum()), np.nan)
+    portfolio = series_stats((values @ np.asarray(shares, dtype=np.float64)[priced])[:, None])
+
+    return {
+        "start": str(dates[0]) if len(dates) else None,
+        "end": str(dates[-1]) if len(dates) else None,
+        "holdings": [
+            {"symbol": symbol, **{name: float(stat[i]) for name, stat in holding.items()}}
+            for i, symbol in enumerate(symbols)
+        ],
+        "portfolio": {name: float(stat[0]) for name, stat in portfolio.items()},
+        "unpriced": [symbol for symbol, has_price in zip(symbols, priced) if not has_price],
+        "correlation": correlation(simple_returns(closes)).tolist()
+    }
+
+def analyze_portfolio(portfolio, store, start, end):
+    """
+    Bring the cached history of every holding up to date and analyze it.
+
+    :param portfolio: StockPortfolio whose positions are analyzed.
+    :param store: HistoryStore used for the series.
+    :param start: First date (inclusive).
+    :param end: Last date (inclusive).
+    :return: The dictionary returned by analyze.
+    """
+    symbols, shares, _ = portfolio.positions.columns()
+    symbols = list(symbols)
+    for symbol in symbols:
+        try:
+            store.update(symbol, start, end)
+        except Exception as e:
+            print(f"Error fetching history for {symbol}: {e}")
+    return analyze(store, symbols, shares.copy(), start, end)
+
+
+if __name__ == "__main__":
+    # Usage: python Stock_portfolio_analytics.py START END SYMBOL[:SHARES] ...
+    start, end = sys.argv[1], sys.argv[2]
+    holdings = [arg.split(":") for arg in sys.argv[3:]]
+    symbols = [holding[0].upper() for holding in holdings]
+    shares = [int(holding[1]) if len(holding) > 1 else 1 for holding in holdings]
+
+    store = HistoryStore()
+    for symbol in symbols:
+        store.update(symbol, start, end)
+    results = analyze(store, symbols, shares, start, end)
+
+    print(f"{'Symbol':<10}{'Return':>10}{'Volatility':>12}{'Drawdown':>10}")
+    for row in results["holdings"]:
+        print(f"{row['symbol']:<10}{row['total_return']:>10.2%}{row['volatility']:>12.2%}{row['max_drawdown']:>10.2%}")
+    p = results["portfolio"]
+    print(f"{'Portfolio':<10}{p['total_return']:>10.2%}{p['volatility']:>12.2%}{p['max_drawdown']:>10.2%}")
+    if results["unpriced"]:
+        print(f"Left out of the portfolio (no prices): {', '.join(results['unpriced'])}")
@@ -0,0 +1,253 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+import numpy as np
+from Stock_portfolio_tracker import StockPortfolio, YFinanceQuoteProvider
+
+class FakeMarketProvider(YFinanceQuoteProvider):
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0, max_workers=16):
+        """
+        Initialize a deterministic stand-in for Yahoo Finance.
+
+        Prices and failures are derived from a hash of the symbol and seed,
+        so every run sees the same market. Requests go through the same
+        thread pool as the real provider.
+
+        :param latency: Seconds each price request takes.
+        :param failure_rate: Fraction of symbols whose requests fail.
+        :param seed: Seed mixed into the prices and failures.
+        :param max_workers: Maximum number of concurrent price requests.
+        """
+        super().__init__(max_workers=max_workers)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.requests = 0  # Price requests that reached this provider, i.e. missed the cache
+        self._lock = threading.Lock()
+
+    def get_price(self, symbol):
+        """
+        Return the fake price for a stock after the configured latency.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: A price between 1 and 1000.
+        """
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = zlib.crc32(f"{self.seed}:{symbol}".encode())
+        if (digest % 10000) < self.failure_rate * 10000:
+            raise ValueError(f"No data found for {symbol}")
+        return 1 + (digest % 99900) / 100
+
+
+def holdings(count):
+    """
+    Generate a deterministic list of holdings.
+
+    :param count: Number of holdings.
+    :return: A list of (symbol, shares) tuples.
+    """
+    return [(f"S{i:06d}", 1 + zlib.crc32(str(i).encode()) % 500) for i in range(count)]
+
+# Fewer samples than this make p99 just the slowest run, so only max_ms is reported
+MIN_P99_SAMPLES = 100
+
+def summarize(name, count, samples, peak, requests):
+    """
+    Summarize timing samples of one scenario.
+
+    :param name: Scenario name.
+    :param count: Number of holdings.
+    :param samples: List of (seconds, items processed) per run.
+    :param peak: Peak traced memory in bytes.
+    :param requests: Upstream price requests per run, showing how many lookups missed the cache.
+    :return: A result dictionary.
+    """
+    seconds = np.array([s for s, _ in samples])
+    items = sum(n for _, n in samples)
+    result = {
+        "scenario": name,
+        "holdings": count,
+        "runs": len(samples),
+        "throughput": items / seconds.sum() if seconds.sum() > 0 else 0.0,
+        "p50_ms": float(np.percentile(seconds, 50) * 1000),
+        "max_ms": float(seconds.max() * 1000),
+        "upstream_requests": requests,
+        "peak_memory_kb": peak / 1024
+    }
+    if len(samples) >= MIN_P99_SAMPLES:
+        result["p99_ms"] = float(np.percentile(seconds, 99) * 1000)
+    return result
+
+def measure(func, runs, upstream):
+    """
+    Time a scenario and trace its peak memory.
+
+    :param func: Callable running the scenario once and returning a (seconds, items) sample.
+    :param runs: Number of timed runs.
+    :param upstream: Callable returning the number of upstream price requests made so far.
+    :return: A tuple (samples, peak memory in bytes, upstream requests per run).
+    """
+    before = upstream()
+    samples = [func() for _ in range(runs)]
+    requests = (upstream() - before) / runs if runs else 0.0
+    # Memory is traced in a separate run so that tracing does not skew the timings
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return samples, peak, requests
+
+def timed(func, items):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start, items
+
+def run_scenarios(count, args, directory):
+    """
+    Run every scenario for one portfolio size.
+
+    :param count: Number of holdings.
+    :param args: Parsed command-line arguments.
+    :param directory: Scratch directory for CSV files.
+    :return: A list of result dictionaries.
+    """
+    providers = []
+
+    def new_portfolio():
+        provider = FakeMarketProvider(args.latency, args.failure_rate, args.seed, args.workers)
+        providers.append(provider)
+        return StockPortfolio(provider=provider, cache_size=max(4096, count))
+
+    def upstream():
+        return sum(provider.requests for provider in providers)
+
+    positions = holdings(count)
+    results = []
+
+    # add_stock: one sample per call, each validating a new symbol
+    portfolio = None
+
+    def add_all():
+        nonlocal portfolio
+        portfolio = new_portfolio()
+        return [timed(lambda: portfolio.add_stock(symbol, shares), 1) for symbol, shares in positions]
+
+    before = upstream()
+    samples = add_all()
+    requests = (upstream() - before) / len(samples) if samples else 0.0
+    tracemalloc.start()
+    add_all()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    results.append(summarize("add_stock", count, samples, peak, requests))
+
+    # view_portfolio, cold: every price has to come from the provider
+    def view_cold():
+        portfolio.price_cache.invalidate()
+        portfolio.positions.clear_prices(list(portfolio.positions.symbols))
+        return timed(portfolio.view_portfolio, count)
+
+    results.append(summarize("view_portfolio_cold", count, *measure(view_cold, args.runs, upstream)))
+
+    # view_portfolio, warm: prices cached, only totals and rows are built
+    results.append(summarize("view_portfolio_warm", count, *measure(lambda: timed(portfolio.view_portfolio, count), args.runs, upstream)))
+
+    export_path = os.path.join(directory, f"export_{count}.csv")
+    results.append(summarize("export_to_csv", count, *measure(lambda: timed(lambda: portfolio.export_to_csv(export_path), count), args.runs, upstream)))
+
+    def import_fresh():
+        target = new_portfolio()
+        return timed(lambda: target.import_from_csv(export_path), count)
+
+    results.append(summarize("import_from_csv", count, *measure(import_fresh, args.runs, upstream)))
+    return results
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """
+    Find scenarios whose median latency regressed against a baseline report.
+
+    :param results: The current report.
+    :param baseline: A previous report.
+    :param tolerance: Allowed slowdown as a fraction (0.2 means 20%).
+    :return: A list of human-readable regression descriptions.
+    """
+    previous = {(r["scenario"], r["holdings"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        before = previous.get((result["scenario"], result["holdings"]))
+        if before and before["p50_ms"] > 0 and result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['scenario']} @ {result['holdings']}: p50 {before['p50_ms']:.3f} ms -> {result['p50_ms']:.3f} ms"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark StockPortfolio against an offline fake market.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000], help="portfolio sizes to run")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per scenario")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake price request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of symbols that fail to price")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent price requests")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the fake market")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown against the baseline")
+    args = parser.parse_args()
+
+    report = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "parameters": {
+            "runs": args.runs, "latency": args.latency, "failure_rate": args.failure_rate,
+            "workers": args.workers, "seed": args.seed
+        },
+        "results": []
+    }
+    stderr = sys.stderr
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        for count in args.sizes:
+            sys.stderr = devnull  # Silence per-symbol error messages from failed prices
+            try:
+                report["results"].extend(run_scenarios(count, args, directory))
+            finally:
+                sys.stderr = stderr
+            print(f"Finished {count} holdings", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("parameters") != report["parameters"]:
+            print("Warning: baseline was run with different parameters", file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -1,34 +1,678 @@
-import yfinance as yf
-import tkinter as tk
-from tkinter import messagebox, filedialog
 import csv
+import json
+import math
+import os
+import numpy as np
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+# The GUI toolkit is only imported when a window is opened (see load_gui), and
+# yfinance on the first live quote, so headless valuations start quickly. numpy
+# stays a top-level import: every valuation goes through the PositionStore.
+tk = messagebox = filedialog = ttk = None
+
+def load_gui():
+    """
+    Import tkinter into this module's namespace.
+    """
+    global tk, messagebox, filedialog, ttk
+    import tkinter as tk
+    from tkinter import messagebox, filedialog, ttk
+
+class QuoteProvider:
+    """
+    Base class for sources of current stock prices.
+    """
+
+    def get_price(self, symbol):
+        """
+        Fetch the latest price for a single stock.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: The latest price.
+        """
+        raise NotImplementedError
+
+    def get_prices(self, symbols, progress=None, cancel_event=None):
+        """
+        Fetch the latest prices for many stocks.
+
+        :param symbols: Iterable of stock symbols.
+        :param progress: Optional callback called as progress(done, total) after each symbol.
+        :param cancel_event: Optional threading.Event; once set, remaining symbols are skipped.
+        :return: A tuple (prices, errors) mapping symbols to prices and to exceptions.
+        """
+        symbols = list(symbols)
+        prices = {}
+        errors = {}
+        for done, symbol in enumerate(symbols, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+            try:
+                prices[symbol] = self.get_price(symbol)
+            except Exception as e:
+                errors[symbol] = e
+            if progress is not None:
+                progress(done, len(symbols))
+        return prices, errors
+
+
+class YFinanceQuoteProvider(QuoteProvider):
+    def __init__(self, max_workers=16):
+        """
+        Initialize a provider that reads closing prices from Yahoo Finance.
+
+        :param max_workers: Maximum number of concurrent price requests.
+        """
+        self.max_workers = max_workers
+
+    def get_price(self, symbol):
+        """
+        Fetch the latest closing price for a single stock.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: The latest closing price.
+        """
+        import yfinance as yf
+
+        stock = yf.Ticker(symbol)
+        return stock.history(period="1d")["Close"].iloc[-1]
+
+    def get_prices(self, symbols, progress=None, cancel_event=None):
+        """
+        Fetch the latest closing prices for many stocks concurrently.
+
+        Requests are spread over a bounded thread pool, so the total time is
+        governed by the slowest request rather than the number of symbols.
+
+        :param symbols: Iterable of stock symbols.
+        :param progress: Optional callback called as progress(done, total) after each symbol.
+        :param cancel_event: Optional threading.Event; once set, pending requests are skipped.
+        :return: A tuple (prices, errors) mapping symbols to prices and to exceptions.
+        """
+        symbols = list(symbols)
+        prices = {}
+        errors = {}
+        if not symbols:
+            return prices, errors
+
+        def fetch(symbol):
+            if cancel_event is not None and cancel_event.is_set():
+                return symbol, None, CancelledError()
+            try:
+                return symbol, self.get_price(symbol), None
+            except Exception as e:
+                return symbol, None, e
+
+        workers = min(self.max_workers, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for done, (symbol, price, error) in enumerate(executor.map(fetch, symbols), start=1):
+                if error is None:
+                    prices[symbol] = price
+                else:
+                    errors[symbol] = error
+                if progress is not None:
+                    progress(done, len(symbols))
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        return prices, errors
+
+
+class LocalQuoteProvider(QuoteProvider):
+    def __init__(self, prices=None):
+        """
+        Initialize an in-memory provider, useful offline and in tests.
+
+        :param prices: Optional mapping of stock symbols to prices.
+        """
+        self.prices = {symbol.upper(): price for symbol, price in (prices or {}).items()}
+
+    def set_price(self, symbol, price):
+        """
+        Set the price reported for a stock.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param price: The new price.
+        """
+        self.prices[symbol.upper()] = price
+
+    @classmethod
+    def from_csv(cls, filename):
+        """
+        Load prices from a CSV file of symbol and price rows.
+
+        :param filename: Name of the CSV file; a header row is skipped.
+        :return: A new LocalQuoteProvider.
+        """
+        prices = {}
+        with open(filename, newline="") as file:
+            for row in csv.reader(file):
+                if len(row) < 2:
+                    continue
+                try:
+                    prices[row[0].strip()] = float(row[1])
+                except ValueError:
+                    continue  # Header or malformed row
+        return cls(prices)
+
+    def get_price(self, symbol):
+        """
+        Look up the price for a single stock.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: The stored price.
+        """
+        if symbol not in self.prices:
+            raise KeyError(f"No price available for {symbol}")
+        return self.prices[symbol]
+
+
+class PriceCache:
+    def __init__(self, provider, ttl=60, max_size=4096):
+        """
+        Initialize a price cache in front of a quote provider.
+
+        :param provider: The QuoteProvider used on cache misses.
+        :param ttl: Number of seconds a fetched price stays valid.
+        :param max_size: Maximum number of cached symbols; the least recently used are evicted first.
+        """
+        self.provider = provider
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # symbol -> (price, fetched_at)
+        self._lock = threading.Lock()
+
+    def _lookup(self, symbol, now):
+        entry = self._entries.get(symbol)
+        if entry is None or now - entry[1] > self.ttl:
+            return None
+        self._entries.move_to_end(symbol)
+        return entry
+
+    def _store(self, symbol, price, now):
+        self._entries[symbol] = (price, now)
+        self._entries.move_to_end(symbol)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_timed_prices(self, symbols, progress=None, cancel_event=None):
+        """
+        Get prices for many stocks with the time each one was fetched, fetching only the ones not cached.
+
+        :param symbols: Iterable of stock symbols.
+        :param progress: Optional callback passed on to the provider for the fetched symbols.
+        :param cancel_event: Optional threading.Event passed on to the provider.
+        :return: A tuple (prices, errors) mapping symbols to (price, fetched_at) with fetched_at
+                 from time.monotonic(), and to exceptions.
+        """
+        prices = {}
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                entry = self._lookup(symbol, now)
+                if entry is None:
+                    missing.append(symbol)
+                else:
+                    prices[symbol] = entry
+            self.hits += len(prices)
+            self.misses += len(missing)
+
+        if missing:
+            fetched, errors = self.provider.get_prices(missing, progress=progress, cancel_event=cancel_event)
+        else:
+            fetched, errors = {}, {}
+
+        now = time.monotonic()
+        with self._lock:
+            for symbol, price in fetched.items():
+                self._store(symbol, price, now)
+                prices[symbol] = (price, now)
+        return prices, errors
+
+    def get_prices(self, symbols, progress=None, cancel_event=None):
+        """
+        Get prices for many stocks, fetching only the ones not cached.
+
+        :param symbols: Iterable of stock symbols.
+        :param progress: Optional callback passed on to the provider for the fetched symbols.
+        :param cancel_event: Optional threading.Event passed on to the provider.
+        :return: A tuple (prices, errors) mapping symbols to prices and to exceptions.
+        """
+        prices, errors = self.get_timed_prices(symbols, progress=progress, cancel_event=cancel_event)
+        return {symbol: price for symbol, (price, _) in prices.items()}, errors
+
+    def get_price(self, symbol, cancel_event=None):
+        """
+        Get the price for a single stock.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param cancel_event: Optional threading.Event passed on to the provider.
+        :return: The cached or freshly fetched price.
+        """
+        prices, errors = self.get_prices([symbol], cancel_event=cancel_event)
+        if symbol in errors:
+            raise errors[symbol]
+        return prices[symbol]
+
+    def invalidate(self, symbol=None):
+        """
+        Drop one cached price, or all of them.
+
+        :param symbol: Stock symbol to drop; None clears the whole cache.
+        """
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        :return: A dictionary with hits, misses, hit rate and current size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries)
+            }
+
+    def entries(self):
+        """
+        Get the cached prices with wall-clock timestamps, for saving or sharing.
+
+        :return: A dictionary mapping symbols to (price, fetched_at) with fetched_at from time.time().
+        """
+        offset = time.time() - time.monotonic()
+        with self._lock:
+            return {symbol: (float(price), fetched_at + offset) for symbol, (price, fetched_at) in self._entries.items()}
+
+    def merge(self, entries):
+        """
+        Add prices from entries(), keeping whichever copy of a symbol is newer.
+
+        :param entries: Dictionary mapping symbols to (price, fetched_at) with fetched_at from time.time().
+        """
+        offset = time.time() - time.monotonic()
+        with self._lock:
+            for symbol, (price, fetched_at) in entries.items():
+                fetched_at -= offset
+                current = self._entries.get(symbol)
+                if current is None or current[1] < fetched_at:
+                    self._store(symbol, price, fetched_at)
+
+    def save(self, path):
+        """
+        Write the cached prices to a JSON file.
+
+        :param path: Path of the file.
+        """
+        with open(path + ".tmp", "w") as file:
+            json.dump(self.entries(), file)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path):
+        """
+        Read cached prices written by save(); prices older than the TTL are ignored on lookup.
+
+        :param path: Path of the file.
+        """
+        with open(path) as file:
+            self.merge({symbol: tuple(entry) for symbol, entry in json.load(file).items()})
+
+
+class PositionStore:
+    def __init__(self, capacity=64):
+        """
+        Initialize an empty columnar store of positions.
+
+        Each symbol owns one row; shares, total cost basis and the last known
+        price live in NumPy arrays so valuations can be computed in a single
+        vectorized pass. Running totals over the priced rows are kept up to
+        date with deltas, so a revaluation only has to touch changed rows.
+
+        :param capacity: Initial number of rows to allocate.
+        """
+        self.symbols = []
+        self.index = {}
+        self.shares = np.zeros(capacity, dtype=np.int64)
+        self.cost = np.zeros(capacity, dtype=np.float64)
+        self.prices = np.full(capacity, np.nan)
+        self.priced_at = np.full(capacity, -np.inf)
+        self.total_value = 0.0
+        self.total_investment = 0.0
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def _grow(self, needed):
+        capacity = len(self.shares)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.shares = np.resize(self.shares, capacity)
+        self.cost = np.resize(self.cost, capacity)
+        self.prices = np.resize(self.prices, capacity)
+        self.priced_at = np.resize(self.priced_at, capacity)
+
+    def add(self, symbol, shares, cost):
+        """
+        Add a lot to a position, creating the position if needed.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param shares: Number of shares in the lot.
+        :param cost: Total amount paid for the lot.
+        :return: The row of the position.
+        """
+        row = self.index.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            self._grow(row + 1)
+            self.symbols.append(symbol)
+            self.index[symbol] = row
+            self.shares[row] = 0
+            self.cost[row] = 0.0
+            self.prices[row] = np.nan
+            self.priced_at[row] = -np.inf
+        elif not np.isnan(self.prices[row]):
+            self.total_value += shares * float(self.prices[row])
+            self.total_investment += cost
+        self.shares[row] += shares
+        self.cost[row] += cost
+        return row
+
+    def remove(self, symbol):
+        """
+        Remove a position by moving the last row into its place.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: True if the position existed, False otherwise.
+        """
+        row = self.index.pop(symbol, None)
+        if row is None:
+            return False
+        if not np.isnan(self.prices[row]):
+            self.total_value -= float(self.shares[row] * self.prices[row])
+            self.total_investment -= float(self.cost[row])
+        last = len(self.symbols) - 1
+        if row != last:
+            moved = self.symbols[last]
+            self.symbols[row] = moved
+            self.index[moved] = row
+            self.shares[row] = self.shares[last]
+            self.cost[row] = self.cost[last]
+            self.prices[row] = self.prices[last]
+            self.priced_at[row] = self.priced_at[last]
+        self.symbols.pop()
+        return True
+
+    def columns(self):
+        """
+        Get views of the active rows.
+
+        :return: A tuple (symbols, shares, cost) aligned by row.
+        """
+        n = len(self.symbols)
+        return self.symbols, self.shares[:n], self.cost[:n]
+
+    def stale_symbols(self, cutoff):
+        """
+        Get the symbols whose price is missing or was set before a cutoff.
+
+        :param cutoff: time.monotonic() value; prices set at or before it are stale.
+        :return: A list of stock symbols.
+        """
+        rows = np.flatnonzero(self.priced_at[:len(self.symbols)] <= cutoff)
+        return [self.symbols[row] for row in rows.tolist()]
+
+    def set_prices(self, prices, priced_at=None):
+        """
+        Record new prices and apply the change in value to the running totals.
+
+        :param prices: Mapping of stock symbols to prices; unknown symbols are ignored.
+        :param priced_at: time.monotonic() value of the prices, or a mapping of stock symbols
+                          to such values (e.g. when they were fetched); defaults to now.
+        """
+        pairs = [(self.index[symbol], price) for symbol, price in prices.items() if symbol in self.index]
+        if not pairs:
+            return
+        if isinstance(priced_at, dict):
+            priced_at = np.fromiter(
+                (priced_at[symbol] for symbol in prices if symbol in self.index), dtype=np.float64, count=len(pairs)
+            )
+        rows = np.fromiter((row for row, _ in pairs), dtype=np.intp, count=len(pairs))
+        new = np.fromiter((price for _, price in pairs), dtype=np.float64, count=len(pairs))
+        old = self.prices[rows]
+        unpriced = np.isnan(old)
+        self.total_value += float((self.shares[rows] * (new - np.where(unpriced, 0.0, old))).sum())
+        self.total_investment += float(self.cost[rows][unpriced].sum())
+        self.prices[rows] = new
+        self.priced_at[rows] = time.monotonic() if priced_at is None else priced_at
+
+    def clear_prices(self, symbols):
+        """
+        Forget the prices of some positions, removing them from the running totals.
+
+        :param symbols: Iterable of stock symbols.
+        """
+        rows = np.fromiter((self.index[symbol] for symbol in symbols if symbol in self.index), dtype=np.intp)
+        rows = rows[~np.isnan(self.prices[rows])]
+        self.total_value -= float((self.shares[rows] * self.prices[rows]).sum())
+        self.total_investment -= float(self.cost[rows].sum())
+        self.prices[rows] = np.nan
+        self.priced_at[rows] = -np.inf
+
+    def recompute_totals(self):
+        """
+        Compute the totals from scratch over every priced row.
+
+        :return: A tuple (total_value, total_investment).
+        """
+        n = len(self.symbols)
+        rows = np.flatnonzero(~np.isnan(self.prices[:n]))
+        return float((self.shares[rows] * self.prices[rows]).sum()), float(self.cost[rows].sum())
+
+    @classmethod
+    def from_columns(cls, symbols, shares, cost):
+        """
+        Build a store from existing columns without adding rows one by one.
+
+        :param symbols: List of stock symbols.
+        :param shares: Array of share counts aligned with symbols.
+        :param cost: Array of total cost basis aligned with symbols.
+        :return: A new PositionStore.
+        """
+        store = cls(capacity=max(64, len(symbols)))
+        store.symbols = list(symbols)
+        store.index = {symbol: row for row, symbol in enumerate(store.symbols)}
+        store.shares[:len(symbols)] = shares
+        store.cost[:len(symbols)] = cost
+        return store
+
+
+class PortfolioStorage:
+    def __init__(self, path):
+        """
+        Open (or create) a SQLite portfolio database in write-ahead-log mode.
+
+        Every change is written as a single-row upsert or delete, so the cost
+        of adding or removing a stock does not depend on the portfolio size.
+
+        :param path: Path of the database file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            "symbol TEXT PRIMARY KEY, shares INTEGER NOT NULL, cost REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def load(self):
+        """
+        Read every saved position.
+
+        :return: A tuple (symbols, shares, cost) of a list and two NumPy arrays.
+        """
+        with self._lock:
+            rows = self.connection.execute("SELECT symbol, shares, cost FROM positions").fetchall()
+        symbols = [row[0] for row in rows]
+        shares = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        cost = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        return symbols, shares, cost
+
+    def add(self, symbol, shares, cost):
+        """
+        Record a lot added to a position.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param shares: Number of shares in the lot.
+        :param cost: Total amount paid for the lot.
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO positions (symbol, shares, cost) VALUES (?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET shares = shares + excluded.shares, cost = cost + excluded.cost",
+                (symbol, int(shares), float(cost))
+            )
+
+    def add_many(self, lots):
+        """
+        Record many lots in a single transaction.
+
+        :param lots: Iterable of (symbol, shares, cost) tuples.
+        """
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO positions (symbol, shares, cost) VALUES (?, ?, ?) "
+                "ON CONFLICT(symbol) DO UPDATE SET shares = shares + excluded.shares, cost = cost + excluded.cost",
+                ((symbol, int(shares), float(cost)) for symbol, shares, cost in lots)
+            )
+
+    def remove(self, symbol):
+        """
+        Record that a position was removed.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        """
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM positions WHERE symbol = ?", (symbol,))
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self.connection.close()
+
 
 class StockPortfolio:
-    def __init__(self):
+    def __init__(self, provider=None, cache_ttl=60, cache_size=4096, storage=None, verify=False):
+        """
+        Initialize a portfolio, empty or backed by saved storage.
+
+        :param provider: QuoteProvider used for prices; defaults to Yahoo Finance.
+        :param cache_ttl: Number of seconds a fetched price is reused.
+        :param cache_size: Maximum number of cached prices.
+        :param storage: Optional PortfolioStorage; saved positions are loaded on first use.
+        :param verify: If True, every valuation checks the running totals against a full recompute.
+        """
+        self.storage = storage
+        self.verify = verify
+        self._positions = None if storage is not None else PositionStore()
+        self.provider = provider if provider is not None else YFinanceQuoteProvider()
+        self.price_cache = PriceCache(self.provider, ttl=cache_ttl, max_size=cache_size)
+
+    def fetch_price(self, symbol, cancel_event=None):
+        """
+        Get the latest price for a single stock, served from the cache when fresh.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param cancel_event: Optional threading.Event; raises CancelledError once set.
+        :return: The latest price.
+        """
+        return self.price_cache.get_price(symbol, cancel_event=cancel_event)
+
+    def fetch_prices(self, symbols, progress=None, cancel_event=None):
+        """
+        Get the latest prices for many stocks, served from the cache when fresh.
+
+        :param symbols: Iterable of stock symbols.
+        :param progress: Optional callback called as progress(done, total) while fetching.
+        :param cancel_event: Optional threading.Event used to abandon the fetch.
+        :return: A tuple (prices, errors) mapping symbols to prices and to exceptions.
+        """
+        return self.price_cache.get_prices(symbols, progress=progress, cancel_event=cancel_event)
+
+    @property
+    def positions(self):
         """
-        Initialize an empty portfolio.
+        Get the position store, loading it from storage on first access.
         """
-        self.portfolio = {}
+        if self._positions is None:
+            self._positions = PositionStore.from_columns(*self.storage.load())
+        return self._positions
 
-    def add_stock(self, symbol, shares):
+    def close(self):
+        """
+        Release the storage backend, if any.
+        """
+        if self.storage is not None:
+            self.storage.close()
+
+    @property
+    def portfolio(self):
+        """
+        Get a snapshot of the holdings as a dictionary of symbol to shares.
+        """
+        symbols, shares, _ = self.positions.columns()
+        return dict(zip(symbols, shares.tolist()))
+
+    def add_stock(self, symbol, shares, price=None, cancel_event=None):
         """
         Add a stock to the portfolio.
         
         :param symbol: Stock symbol (e.g., "AAPL").
         :param shares: Number of shares to add.
+        :param price: Price paid per share; defaults to the current price.
+        :param cancel_event: Optional threading.Event; raises CancelledError once set, before anything is added.
         :return: True if successful, False otherwise.
         """
         symbol = symbol.upper()
         try:
-            stock = yf.Ticker(symbol)
-            price = stock.history(period="1d")["Close"].iloc[-1]  # Fetch current price
-            if symbol in self.portfolio:
-                self.portfolio[symbol] += shares
-            else:
-                self.portfolio[symbol] = shares
+            current_price = self.fetch_price(symbol, cancel_event=cancel_event)  # Validate the symbol and warm the price cache
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+            if price is None:
+                price = current_price
+            positions = self.positions  # Load before writing, or the new row would be counted twice
+            if self.storage is not None:
+                self.storage.add(symbol, shares, price * shares)
+            positions.add(symbol, shares, price * shares)
             return True
+        except CancelledError:
+            raise
         except Exception as e:
-            print(f"Error: {e}")
+            print(f"Error: {e}", file=sys.stderr)
             return False
 
     def remove_stock(self, symbol):
@@ -39,16 +683,22 @@ class StockPortfolio:
         :return: True if successful, False otherwise.
         """
         symbol = symbol.upper()
-        if symbol in self.portfolio:
-            del self.portfolio[symbol]
-            return True
-        else:
+        if symbol not in self.positions:
             return False
+        if self.storage is not None:
+            self.storage.remove(symbol)
+        return self.positions.remove(symbol)
 
-    def view_portfolio(self):
+    def view_portfolio(self, progress=None, cancel_event=None):
         """
         Get the current portfolio with real-time stock data.
         
+        Only holdings that were added since the last valuation, failed to
+        price, or whose price is older than the cache TTL are re-priced; the
+        totals are maintained incrementally from those changes.
+
+        :param progress: Optional callback called as progress(done, total) while fetching prices.
+        :param cancel_event: Optional threading.Event; raises CancelledError once set.
         :return: A dictionary containing portfolio details.
         """
         portfolio_details = {
@@ -59,45 +709,477 @@ class StockPortfolio:
             "percentage_change": 0
         }
 
-        for symbol, shares in self.portfolio.items():
-            try:
-                stock = yf.Ticker(symbol)
-                price = stock.history(period="1d")["Close"].iloc[-1]
-                value = price * shares
-                portfolio_details["stocks"].append({
-                    "symbol": symbol,
-                    "shares": shares,
-                    "price": price,
-                    "value": value
-                })
-                portfolio_details["total_investment"] += price * shares
-                portfolio_details["total_value"] += value
-            except Exception as e:
-                print(f"Error fetching data for {symbol}: {e}")
+        positions = self.positions
+        stale = positions.stale_symbols(time.monotonic() - self.price_cache.ttl)
+        # Stamp each price with when it was fetched, so a cached price expires on time
+        timed, errors = self.price_cache.get_timed_prices(stale, progress=progress, cancel_event=cancel_event)
+        for symbol, error in errors.items():
+            print(f"Error fetching data for {symbol}: {error}", file=sys.stderr)
+        positions.set_prices(
+            {symbol: price for symbol, (price, _) in timed.items()},
+            priced_at={symbol: fetched_at for symbol, (_, fetched_at) in timed.items()}
+        )
+        positions.clear_prices(errors)
+        if self.verify:
+            self.verify_totals()
+
+        symbols, shares, cost = positions.columns()
+        price_array = positions.prices[:len(symbols)]
+        rows = np.flatnonzero(~np.isnan(price_array))
+        values = price_array[rows] * shares[rows]
 
+        portfolio_details["stocks"] = [
+            {"symbol": symbols[row], "shares": n, "price": price, "value": value, "cost": paid}
+            for row, n, price, value, paid in zip(
+                rows.tolist(), shares[rows].tolist(), price_array[rows].tolist(), values.tolist(), cost[rows].tolist()
+            )
+        ]
+        portfolio_details["total_investment"] = positions.total_investment
+        portfolio_details["total_value"] = positions.total_value
         portfolio_details["profit_loss"] = portfolio_details["total_value"] - portfolio_details["total_investment"]
         if portfolio_details["total_investment"] > 0:
             portfolio_details["percentage_change"] = (portfolio_details["profit_loss"] / portfolio_details["total_investment"]) * 100
 
         return portfolio_details
 
-    def export_to_csv(self, filename):
+    def update_price(self, symbol, price):
+        """
+        Apply a single price update, adjusting the totals by the change in value.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param price: The new price.
+        """
+        self.positions.set_prices({symbol.upper(): price})
+        if self.verify:
+            self.verify_totals()
+
+    def verify_totals(self, rel_tol=1e-9):
+        """
+        Check the running totals against a full recompute.
+
+        :param rel_tol: Relative tolerance allowed for floating-point rounding.
+        :return: A tuple (total_value, total_investment) from the full recompute.
+        """
+        positions = self.positions
+        total_value, total_investment = positions.recompute_totals()
+        for name, running, full in (
+            ("total value", positions.total_value, total_value),
+            ("total investment", positions.total_investment, total_investment)
+        ):
+            if not math.isclose(running, full, rel_tol=rel_tol, abs_tol=1e-6):
+                raise RuntimeError(f"Running {name} {running} differs from full recompute {full}")
+        return total_value, total_investment
+
+    def export_to_csv(self, filename, progress=None, cancel_event=None, chunk_size=1000):
         """
         Export the portfolio data to a CSV file.
+
+        Rows are priced and written one chunk at a time, so memory use does not
+        grow with the number of holdings.
         
         :param filename: Name of the CSV file.
+        :param progress: Optional callback called as progress(done, total) after each chunk.
+        :param cancel_event: Optional threading.Event; raises CancelledError once set.
+        :param chunk_size: Number of holdings priced per batch.
+        :return: A dictionary with the number of rows written, elapsed seconds and rows per second.
         """
-        portfolio_details = self.view_portfolio()
+        start = time.perf_counter()
+        symbols, shares, cost = self.positions.columns()
+        symbols = list(symbols)
+        total_investment = 0.0
+        total_value = 0.0
+        written = 0
+
         with open(filename, mode="w", newline="") as file:
             writer = csv.writer(file)
-            writer.writerow(["Symbol", "Shares", "Price ($)", "Value ($)"])
-            for stock in portfolio_details["stocks"]:
-                writer.writerow([stock["symbol"], stock["shares"], stock["price"], stock["value"]])
+            writer.writerow(["Symbol", "Shares", "Price ($)", "Value ($)", "Cost Basis ($)"])
+            for begin in range(0, len(symbols), chunk_size):
+                chunk = symbols[begin:begin + chunk_size]
+                prices, errors = self.fetch_prices(chunk, cancel_event=cancel_event)
+                for symbol, error in errors.items():
+                    print(f"Error fetching data for {symbol}: {error}", file=sys.stderr)
+
+                price_array = np.fromiter((prices.get(symbol, np.nan) for symbol in chunk), dtype=np.float64, count=len(chunk))
+                rows = np.flatnonzero(~np.isnan(price_array))
+                chunk_shares = shares[begin:begin + chunk_size][rows]
+                chunk_prices = price_array[rows]
+                chunk_values = chunk_prices * chunk_shares
+                chunk_cost = cost[begin:begin + chunk_size][rows]
+
+                writer.writerows(zip(
+                    [chunk[row] for row in rows.tolist()], chunk_shares.tolist(), chunk_prices.tolist(),
+                    chunk_values.tolist(), chunk_cost.tolist()
+                ))
+                total_value += float(chunk_values.sum())
+                total_investment += float(chunk_cost.sum())
+                written += len(rows)
+                if progress is not None:
+                    progress(begin + len(chunk), len(symbols))
+
+            profit_loss = total_value - total_investment
+            percentage_change = (profit_loss / total_investment) * 100 if total_investment > 0 else 0
             writer.writerow([])
-            writer.writerow(["Total Investment", portfolio_details["total_investment"]])
-            writer.writerow(["Total Value", portfolio_details["total_value"]])
-            writer.writerow(["Profit/Loss", portfolio_details["profit_loss"]])
-            writer.writerow(["Percentage Change", portfolio_details["percentage_change"]])
+            writer.writerow(["Total Investment", total_investment])
+            writer.writerow(["Total Value", total_value])
+            writer.writerow(["Profit/Loss", profit_loss])
+            writer.writerow(["Percentage Change", percentage_change])
+
+        return self._throughput(written, start)
+
+    def import_from_csv(self, filename, progress=None, cancel_event=None, chunk_size=1000):
+        """
+        Import holdings from a CSV file in chunks.
+
+        The file needs Symbol and Shares columns and may carry a "Price Paid"
+        (per share) or "Cost Basis" (total) column; files written by
+        export_to_csv can be imported directly. Symbols in each chunk are
+        validated with one batched price request, and rows with unknown
+        symbols or invalid share counts (including fractional ones) are
+        reported and skipped. Blank rows are skipped; the summary rows of an
+        exported file end the holdings. The first row is only taken as a
+        header when it names the Symbol or Shares column.
+
+        :param filename: Name of the CSV file.
+        :param progress: Optional callback called as progress(done, total) with characters read.
+        :param cancel_event: Optional threading.Event; raises CancelledError once set.
+        :param chunk_size: Number of rows validated per batch.
+        :return: A dictionary with rows imported and failed, elapsed seconds and rows per second.
+        """
+        start = time.perf_counter()
+        total_size = os.path.getsize(filename)
+        read = 0
+        imported = 0
+        failed = 0
+
+        with open(filename, newline="") as file:
+            def lines():
+                nonlocal read
+                for line in file:
+                    read += len(line)
+                    yield line
+
+            reader = csv.reader(lines())
+            columns = {"symbol": 0, "shares": 1, "price": 2, "cost": None}
+            chunk = []
+            after_blank = False
+            for row in reader:
+                if not row or not any(field.strip() for field in row):
+                    after_blank = True
+                    continue
+                if after_blank and row[0].strip().startswith("Total "):
+                    break  # Summary rows of an exported file follow a blank row
+                after_blank = False
+                if reader.line_num == 1 and self._is_header(row):
+                    columns = self._csv_columns(row)
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    added, skipped = self._import_rows(chunk, columns, cancel_event)
+                    imported += added
+                    failed += skipped
+                    chunk = []
+                    if progress is not None:
+                        progress(min(read, total_size), total_size)
+            if chunk:
+                added, skipped = self._import_rows(chunk, columns, cancel_event)
+                imported += added
+                failed += skipped
+
+        if progress is not None:
+            progress(total_size, total_size)
+        stats = self._throughput(imported + failed, start)
+        stats["imported"] = imported
+        stats["failed"] = failed
+        return stats
+
+    def _import_rows(self, rows, columns, cancel_event):
+        parsed = []
+        failed = 0
+        for row in rows:
+            try:
+                symbol = row[columns["symbol"]].strip().upper()
+                shares = float(row[columns["shares"]])
+                if not symbol or not math.isfinite(shares) or shares < 1 or not shares.is_integer():
+                    raise ValueError(f"invalid holding {row}")
+                shares = int(shares)
+                cost = None
+                if columns["cost"] is not None and len(row) > columns["cost"] and row[columns["cost"]].strip():
+                    cost = float(row[columns["cost"]])
+                elif columns["price"] is not None and len(row) > columns["price"] and row[columns["price"]].strip():
+                    cost = float(row[columns["price"]]) * shares
+                if cost is not None and not math.isfinite(cost):
+                    raise ValueError(f"invalid cost in {row}")
+                parsed.append((symbol, shares, cost))
+            except (IndexError, ValueError, OverflowError) as e:
+                print(f"Error importing row {row}: {e}", file=sys.stderr)
+                failed += 1
+
+        prices, errors = self.fetch_prices({symbol for symbol, _, _ in parsed}, cancel_event=cancel_event)
+        for symbol, error in errors.items():
+            print(f"Error fetching data for {symbol}: {error}", file=sys.stderr)
+
+        lots = []
+        for symbol, shares, cost in parsed:
+            if symbol in errors:
+                failed += 1
+                continue
+            lots.append((symbol, shares, cost if cost is not None else prices[symbol] * shares))
+        positions = self.positions  # Load before writing, or the new rows would be counted twice
+        if self.storage is not None:
+            self.storage.add_many(lots)
+        for symbol, shares, cost in lots:
+            positions.add(symbol, shares, cost)
+        return len(lots), failed
+
+    @staticmethod
+    def _csv_columns(header):
+        columns = {"symbol": 0, "shares": 1, "price": None, "cost": None}
+        for i, name in enumerate(header):
+            name = name.strip().lower()
+            if name.startswith("symbol"):
+                columns["symbol"] = i
+            elif name.startswith("shares"):
+                columns["shares"] = i
+            elif "cost" in name:
+                columns["cost"] = i
+            elif "paid" in name:
+                columns["price"] = i
+        return columns
+
+    @staticmethod
+    def _is_header(row):
+        # Only a row naming the Symbol or Shares column is a header; anything else is a holding
+        return any(name.strip().lower().startswith(("symbol", "shares")) for name in row)
+
+    @staticmethod
+    def _throughput(rows, start):
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else 0.0
+        }
+
+
+class PortfolioTable:
+    COLUMNS = (
+        ("symbol", "Symbol", 80, "{}"),
+        ("shares", "Shares", 80, "{}"),
+        ("price", "Price ($)", 100, "{:.2f}"),
+        ("value", "Value ($)", 110, "{:.2f}"),
+        ("cost", "Cost ($)", 110, "{:.2f}")
+    )
+
+    def __init__(self, parent, visible_rows=10):
+        """
+        Initialize a table that only renders the rows currently in view.
+
+        The Treeview holds a fixed pool of visible_rows items; scrolling and
+        sorting just refill those items from the row data, so rendering cost
+        does not depend on how many holdings there are.
+
+        :param parent: The widget the table is placed in.
+        :param visible_rows: Number of rows shown at once.
+        """
+        self.frame = tk.Frame(parent)
+        self.visible_rows = visible_rows
+        self.rows = []           # Row tuples in the order they were given
+        self.order = []          # Row indexes in display order
+        self.position = {}       # Symbol -> display position
+        self.offset = 0
+        self.sort_column = None
+        self.sort_reverse = False
+
+        names = [name for name, _, _, _ in self.COLUMNS]
+        self.tree = ttk.Treeview(self.frame, columns=names, show="headings", height=visible_rows, selectmode="browse")
+        for name, heading, width, _ in self.COLUMNS:
+            self.tree.heading(name, text=heading, command=lambda name=name: self.sort_by(name))
+            self.tree.column(name, width=width, anchor="e" if name != "symbol" else "w")
+        for i in range(visible_rows):
+            self.tree.insert("", tk.END, iid=f"row{i}", values=())
+
+        self.scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_rows(self, stocks):
+        """
+        Replace the table contents, keeping the current sort order and scroll position.
+
+        :param stocks: List of stock dictionaries as returned by StockPortfolio.view_portfolio.
+        """
+        names = [name for name, _, _, _ in self.COLUMNS]
+        self.rows = [tuple(stock[name] for name in names) for stock in stocks]
+        self._sort()
+        self.render()
+
+    def update_row(self, stock):
+        """
+        Update a single row in place, redrawing it only if it is on screen.
+
+        :param stock: Stock dictionary with the same keys as view_portfolio's entries.
+        :return: True if the symbol is in the table, False otherwise.
+        """
+        display = self.position.get(stock["symbol"])
+        if display is None:
+            return False
+        row = self.order[display]
+        self.rows[row] = tuple(stock[name] for name, _, _, _ in self.COLUMNS)
+        if self.offset <= display < self.offset + self.visible_rows:
+            self.tree.item(f"row{display - self.offset}", values=self._format(self.rows[row]))
+        return True
+
+    def sort_by(self, column):
+        """
+        Sort by a column, toggling the direction when it is already the sort column.
+
+        :param column: Column name, e.g. "value".
+        """
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._sort()
+        self.render()
+
+    def _sort(self):
+        order = range(len(self.rows))
+        if self.sort_column is not None:
+            key = [name for name, _, _, _ in self.COLUMNS].index(self.sort_column)
+            order = sorted(order, key=lambda row: self.rows[row][key], reverse=self.sort_reverse)
+        self.order = list(order)
+        self.position = {self.rows[row][0]: display for display, row in enumerate(self.order)}
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+
+    def _format(self, row):
+        return [fmt.format(value) for value, (_, _, _, fmt) in zip(row, self.COLUMNS)]
+
+    def render(self):
+        """
+        Fill the visible items from the rows at the current scroll offset.
+        """
+        for i in range(self.visible_rows):
+            display = self.offset + i
+            values = self._format(self.rows[self.order[display]]) if display < len(self.order) else ()
+            self.tree.item(f"row{i}", values=values)
+
+        if self.rows:
+            first = self.offset / len(self.rows)
+            last = min(1.0, (self.offset + self.visible_rows) / len(self.rows))
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+    def scroll_to(self, offset):
+        """
+        Scroll so that the given display position is the first visible row.
+
+        :param offset: Display position of the first visible row.
+        """
+        offset = max(0, min(int(offset), len(self.rows) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.scroll_to(float(amount) * len(self.rows))
+        elif unit == tk.PAGES:
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+
+class BackgroundTask:
+    def __init__(self):
+        """
+        Initialize the shared state between a background operation and the GUI.
+        """
+        self.future = None
+        self.cancel_event = threading.Event()
+        self.progress = (0, 0)
+
+    def report_progress(self, done, total):
+        """
+        Record progress from the worker thread; the GUI picks it up on its next poll.
+
+        :param done: Number of completed steps.
+        :param total: Total number of steps.
+        """
+        self.progress = (done, total)
+
+    def cancel(self):
+        """
+        Ask the operation to stop as soon as possible.
+        """
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class BackgroundRunner:
+    def __init__(self, root, max_workers=2, poll_interval=50):
+        """
+        Initialize a worker pool whose results are delivered on the Tk event loop.
+
+        :param root: The root window whose event loop receives the results.
+        :param max_workers: Number of worker threads.
+        :param poll_interval: Milliseconds between checks for finished work.
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def run(self, func, on_success=None, on_error=None, on_progress=None):
+        """
+        Run func(task) on a worker thread and report back on the Tk thread.
+
+        :param func: Callable taking the BackgroundTask, executed off the event loop.
+        :param on_success: Called with the result when func returns.
+        :param on_error: Called with the exception when func raises or is cancelled.
+        :param on_progress: Called with (done, total) while func is running.
+        :return: The BackgroundTask, which can be cancelled.
+        """
+        task = BackgroundTask()
+        task.future = self.executor.submit(func, task)
+        self.root.after(self.poll_interval, self._poll, task, on_success, on_error, on_progress)
+        return task
+
+    def _poll(self, task, on_success, on_error, on_progress):
+        if not task.future.done():
+            if on_progress is not None:
+                on_progress(*task.progress)
+            self.root.after(self.poll_interval, self._poll, task, on_success, on_error, on_progress)
+            return
+
+        if task.future.cancelled():
+            error = CancelledError()
+        else:
+            error = task.future.exception()
+        if error is None:
+            if on_success is not None:
+                on_success(task.future.result())
+        elif on_error is not None:
+            on_error(error)
+
+    def shutdown(self):
+        """
+        Stop accepting work and abandon queued operations.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
 
 class StockPortfolioApp:
@@ -107,11 +1189,15 @@ class StockPortfolioApp:
         
         :param root: The root window of the application.
         """
+        load_gui()
         self.root = root
         self.root.title("Stock Portfolio Tracker")
-        self.root.geometry("600x400")
+        self.root.geometry("600x560")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         self.portfolio = StockPortfolio()
+        self.runner = BackgroundRunner(self.root)
+        self.current_task = None
 
         # Login Frame
         self.login_frame = tk.Frame(self.root)
@@ -138,15 +1224,34 @@ class StockPortfolioApp:
         self.shares_entry = tk.Entry(self.main_frame)
         self.shares_entry.grid(row=1, column=1, padx=5)
 
-        tk.Button(self.main_frame, text="Add Stock", command=self.add_stock).grid(row=2, column=0, padx=5, pady=10)
-        tk.Button(self.main_frame, text="Remove Stock", command=self.remove_stock).grid(row=2, column=1, padx=5, pady=10)
-        tk.Button(self.main_frame, text="View Portfolio", command=self.view_portfolio).grid(row=3, column=0, padx=5, pady=10)
-        tk.Button(self.main_frame, text="Export to CSV", command=self.export_to_csv).grid(row=3, column=1, padx=5, pady=10)
-        tk.Button(self.main_frame, text="Logout", command=self.logout).grid(row=4, column=0, columnspan=2, pady=10)
+        tk.Label(self.main_frame, text="Price Paid (optional):").grid(row=2, column=0, padx=5)
+        self.price_entry = tk.Entry(self.main_frame)
+        self.price_entry.grid(row=2, column=1, padx=5)
+
+        self.action_buttons = [
+            tk.Button(self.main_frame, text="Add Stock", command=self.add_stock),
+            tk.Button(self.main_frame, text="Remove Stock", command=self.remove_stock),
+            tk.Button(self.main_frame, text="View Portfolio", command=self.view_portfolio),
+            tk.Button(self.main_frame, text="Export to CSV", command=self.export_to_csv),
+            tk.Button(self.main_frame, text="Import CSV", command=self.import_from_csv)
+        ]
+        for i, button in enumerate(self.action_buttons):
+            button.grid(row=3 + i // 3, column=i % 3, padx=5, pady=10)
+        tk.Button(self.main_frame, text="Logout", command=self.logout).grid(row=5, column=0, columnspan=3, pady=10)
+
+        # Progress Display
+        self.status_label = tk.Label(self.main_frame, text="")
+        self.status_label.grid(row=6, column=0, sticky="w", padx=10)
+        self.progress_bar = ttk.Progressbar(self.main_frame, length=200, mode="determinate")
+        self.progress_bar.grid(row=6, column=1, sticky="w", padx=5)
+        self.cancel_button = tk.Button(self.main_frame, text="Cancel", command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.grid(row=6, column=2, padx=5)
 
         # Portfolio Display
-        self.portfolio_text = tk.Text(self.main_frame, height=10, width=50)
-        self.portfolio_text.grid(row=5, column=0, columnspan=2, padx=10, pady=10)
+        self.portfolio_table = PortfolioTable(self.main_frame)
+        self.portfolio_table.grid(row=7, column=0, columnspan=3, padx=10, pady=(10, 0))
+        self.summary_label = tk.Label(self.main_frame, text="", justify=tk.LEFT)
+        self.summary_label.grid(row=8, column=0, columnspan=3, sticky="w", padx=10)
 
     def login(self):
         """
@@ -157,6 +1262,7 @@ class StockPortfolioApp:
 
         # Simple authentication (for demonstration purposes)
         if username == "user" and password == "password":
+            self.portfolio = StockPortfolio(storage=PortfolioStorage(f"portfolio_{username}.db"))
             self.login_frame.pack_forget()
             self.main_frame.pack(pady=20)
         else:
@@ -166,9 +1272,73 @@ class StockPortfolioApp:
         """
         Handle user logout.
         """
+        self.cancel_task()
         self.main_frame.pack_forget()
         self.login_frame.pack(pady=20)
-        self.portfolio = StockPortfolio()  # Reset portfolio
+        self.portfolio.close()  # Holdings stay saved for the next login
+        self.portfolio = StockPortfolio()
+
+    def close(self):
+        """
+        Cancel any running operation and close the window.
+        """
+        self.cancel_task()
+        self.runner.shutdown()
+        self.portfolio.close()
+        self.root.destroy()
+
+    def start_task(self, message, func, on_success):
+        """
+        Run a portfolio operation in the background while the window stays responsive.
+
+        :param message: Status text shown while the operation runs.
+        :param func: Callable taking the BackgroundTask, executed on a worker thread.
+        :param on_success: Called on the Tk thread with the operation's result.
+        """
+        for button in self.action_buttons:
+            button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_label.config(text=message)
+        self.progress_bar.config(value=0, maximum=1)
+
+        portfolio = self.portfolio
+
+        def succeeded(result):
+            self.finish_task()
+            if self.portfolio is portfolio:
+                on_success(result)
+
+        def failed(error):
+            self.finish_task()
+            if isinstance(error, CancelledError):
+                self.status_label.config(text="Cancelled.")
+            elif self.portfolio is portfolio:
+                messagebox.showerror("Error", f"Operation failed: {error}")
+
+        def progressed(done, total):
+            if total:
+                self.progress_bar.config(value=done, maximum=total)
+                self.status_label.config(text=f"{message} {done}/{total}")
+
+        self.current_task = self.runner.run(func, on_success=succeeded, on_error=failed, on_progress=progressed)
+
+    def finish_task(self):
+        """
+        Restore the controls after a background operation ends.
+        """
+        self.current_task = None
+        for button in self.action_buttons:
+            button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_label.config(text="")
+        self.progress_bar.config(value=0)
+
+    def cancel_task(self):
+        """
+        Cancel the running background operation, if any.
+        """
+        if self.current_task is not None:
+            self.current_task.cancel()
 
     def add_stock(self):
         """
@@ -176,6 +1346,7 @@ class StockPortfolioApp:
         """
         symbol = self.symbol_entry.get()
         shares = self.shares_entry.get()
+        price = self.price_entry.get()
 
         if not symbol or not shares:
             messagebox.showerror("Error", "Please enter both stock symbol and shares.")
@@ -189,10 +1360,29 @@ class StockPortfolioApp:
             messagebox.showerror("Error", "Shares must be a positive integer.")
             return
 
-        if self.portfolio.add_stock(symbol, shares):
-            messagebox.showinfo("Success", f"Added {shares} shares of {symbol} to the portfolio.")
+        if price:
+            try:
+                price = float(price)
+                if price <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Error", "Price paid must be a positive number.")
+                return
         else:
-            messagebox.showerror("Error", "Failed to add stock. Please check the symbol and try again.")
+            price = None
+
+        def added(success):
+            if success:
+                messagebox.showinfo("Success", f"Added {shares} shares of {symbol} to the portfolio.")
+            else:
+                messagebox.showerror("Error", "Failed to add stock. Please check the symbol and try again.")
+
+        portfolio = self.portfolio
+        self.start_task(
+            f"Checking {symbol}...",
+            lambda task: portfolio.add_stock(symbol, shares, price, cancel_event=task.cancel_event),
+            added
+        )
 
     def remove_stock(self):
         """
@@ -211,41 +1401,191 @@ class StockPortfolioApp:
 
     def view_portfolio(self):
         """
-        Display the current portfolio.
+        Fetch the current portfolio in the background and display it when ready.
         """
-        portfolio_details = self.portfolio.view_portfolio()
-        self.portfolio_text.delete(1.0, tk.END)
+        portfolio = self.portfolio
+        self.start_task(
+            "Pricing portfolio...",
+            lambda task: portfolio.view_portfolio(progress=task.report_progress, cancel_event=task.cancel_event),
+            self.show_portfolio
+        )
 
-        if not portfolio_details["stocks"]:
-            self.portfolio_text.insert(tk.END, "Your portfolio is empty.")
-            return
+    def show_portfolio(self, portfolio_details):
+        """
+        Display the current portfolio.
 
-        self.portfolio_text.insert(tk.END, "Stock Portfolio:\n")
-        self.portfolio_text.insert(tk.END, "-" * 50 + "\n")
-        self.portfolio_text.insert(tk.END, f"{'Symbol':<10}{'Shares':<10}{'Price ($)':<15}{'Value ($)':<15}\n")
-        self.portfolio_text.insert(tk.END, "-" * 50 + "\n")
+        :param portfolio_details: The dictionary returned by StockPortfolio.view_portfolio.
+        """
+        stocks = portfolio_details["stocks"]
+        table = self.portfolio_table
+        if [stock["symbol"] for stock in stocks] == [row[0] for row in table.rows]:
+            for stock in stocks:
+                table.update_row(stock)
+        else:
+            table.set_rows(stocks)
 
-        for stock in portfolio_details["stocks"]:
-            self.portfolio_text.insert(tk.END, f"{stock['symbol']:<10}{stock['shares']:<10}{stock['price']:<15.2f}{stock['value']:<15.2f}\n")
+        if not stocks:
+            self.summary_label.config(text="Your portfolio is empty.")
+            return
 
-        self.portfolio_text.insert(tk.END, "-" * 50 + "\n")
-        self.portfolio_text.insert(tk.END, f"Total Investment: ${portfolio_details['total_investment']:.2f}\n")
-        self.portfolio_text.insert(tk.END, f"Total Value: ${portfolio_details['total_value']:.2f}\n")
-        self.portfolio_text.insert(tk.END, f"Profit/Loss: ${portfolio_details['profit_loss']:.2f}\n")
-        self.portfolio_text.insert(tk.END, f"Percentage Change: {portfolio_details['percentage_change']:.2f}%\n")
-        self.portfolio_text.insert(tk.END, "-" * 50 + "\n")
+        self.summary_label.config(text=(
+            f"Total Investment: ${portfolio_details['total_investment']:.2f}    "
+            f"Total Value: ${portfolio_details['total_value']:.2f}\n"
+            f"Profit/Loss: ${portfolio_details['profit_loss']:.2f}    "
+            f"Percentage Change: {portfolio_details['percentage_change']:.2f}%"
+        ))
 
     def export_to_csv(self):
         """
-        Export the portfolio data to a CSV file.
+        Export the portfolio data to a CSV file in the background.
         """
         filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
         if filename:
-            self.portfolio.export_to_csv(filename)
-            messagebox.showinfo("Success", f"Portfolio data exported to {filename}.")
+            portfolio = self.portfolio
+            self.start_task(
+                "Exporting...",
+                lambda task: portfolio.export_to_csv(filename, progress=task.report_progress, cancel_event=task.cancel_event),
+                lambda stats: messagebox.showinfo(
+                    "Success",
+                    f"Portfolio data exported to {filename}.\n"
+                    f"{stats['rows']} rows at {stats['rows_per_second']:.0f} rows/s."
+                )
+            )
+
+    def import_from_csv(self):
+        """
+        Import holdings from a CSV file in the background.
+        """
+        filename = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if filename:
+            portfolio = self.portfolio
+            self.start_task(
+                "Importing...",
+                lambda task: portfolio.import_from_csv(filename, progress=task.report_progress, cancel_event=task.cancel_event),
+                lambda stats: messagebox.showinfo(
+                    "Success",
+                    f"Imported {stats['imported']} holdings from {filename} ({stats['failed']} skipped).\n"
+                    f"{stats['rows']} rows at {stats['rows_per_second']:.0f} rows/s."
+                )
+            )
+
+
+def output_path(path, options):
+    """
+    Get the file a holdings file's valuation is written to.
+
+    :param path: Path of a holdings CSV file.
+    :param options: Dictionary with "format" and "output_dir" entries.
+    :return: The path of the valuation file.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    output_dir = options["output_dir"] or os.path.dirname(os.path.abspath(path))
+    return os.path.join(output_dir, f"{stem}.valuation.{options['format']}")
+
+def value_file(path, options):
+    """
+    Value one holdings file headlessly and write the result next to it.
+
+    :param path: Path of a holdings CSV file (see StockPortfolio.import_from_csv).
+    :param options: Dictionary with "prices", "price_cache", "ttl", "format" and "output_dir" entries.
+    :return: A tuple (summary, cache_entries) with the totals and the prices fetched.
+    """
+    start = time.perf_counter()
+    if options["prices"]:
+        provider = LocalQuoteProvider.from_csv(options["prices"])
+    else:
+        provider = YFinanceQuoteProvider()
+    portfolio = StockPortfolio(provider=provider, cache_ttl=options["ttl"])
+    if options["price_cache"] and os.path.exists(options["price_cache"]):
+        portfolio.price_cache.load(options["price_cache"])
+
+    stats = portfolio.import_from_csv(path)
+    output = output_path(path, options)
+    if options["format"] == "csv":
+        portfolio.export_to_csv(output)
+        details = portfolio.view_portfolio()
+    else:
+        details = portfolio.view_portfolio()
+        with open(output, "w") as file:
+            json.dump(details, file, indent=2)
+
+    summary = {
+        "file": path,
+        "output": output,
+        "holdings": stats["imported"],
+        "skipped": stats["failed"],
+        "total_investment": details["total_investment"],
+        "total_value": details["total_value"],
+        "profit_loss": details["profit_loss"],
+        "percentage_change": details["percentage_change"],
+        "seconds": time.perf_counter() - start,
+        "cache": portfolio.price_cache.stats()
+    }
+    return summary, portfolio.price_cache.entries()
+
+def main(argv=None):
+    """
+    Run the GUI, or value holdings files headlessly when files are given.
+
+    :param argv: Command-line arguments; defaults to sys.argv[1:].
+    :return: Process exit status.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        load_gui()
+        root = tk.Tk()
+        app = StockPortfolioApp(root)
+        root.mainloop()
+        return 0
+
+    import argparse
+    parser = argparse.ArgumentParser(description="Value holdings CSV files without the GUI.")
+    parser.add_argument("files", nargs="+", help="holdings CSV files with Symbol and Shares columns")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="valuation output format")
+    parser.add_argument("--output-dir", help="directory for the valuations (default: next to each input)")
+    parser.add_argument("--prices", help="CSV of Symbol,Price to use instead of Yahoo Finance")
+    parser.add_argument("--price-cache", help="JSON file of cached prices, read before and updated after the run")
+    parser.add_argument("--ttl", type=float, default=900, help="seconds a cached price stays valid")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="number of files valued in parallel")
+    args = parser.parse_args(argv)
+
+    options = {
+        "prices": args.prices,
+        "price_cache": args.price_cache,
+        "ttl": args.ttl,
+        "format": args.format,
+        "output_dir": args.output_dir
+    }
+    # Files are valued in parallel, so two of them must never write the same output
+    outputs = {}
+    for path in args.files:
+        output = os.path.abspath(output_path(path, options))
+        if output in outputs:
+            parser.error(f"{outputs[output]} and {path} would both be written to {output}")
+        outputs[output] = path
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = max(1, min(args.jobs or 1, len(args.files)))
+    if jobs == 1:
+        results = [value_file(path, options) for path in args.files]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(value_file, args.files, [options] * len(args.files)))
+
+    if args.price_cache:
+        cache = PriceCache(None, ttl=args.ttl, max_size=sys.maxsize)
+        if os.path.exists(args.price_cache):
+            cache.load(args.price_cache)
+        for _, entries in results:
+            cache.merge(entries)
+        cache.save(args.price_cache)
+
+    for summary, _ in results:
+        print(json.dumps(summary))
+    return 0
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = StockPortfolioApp(root)
-    root.mainloop()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,203 @@
+import json
+import os
+import numpy as np
+
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8")
+])
+
+def yfinance_history(symbol, start, end):
+    """
+    Download daily OHLC bars from Yahoo Finance.
+
+    :param symbol: Stock symbol (e.g., "AAPL").
+    :param start: First date to fetch (numpy.datetime64, inclusive).
+    :param end: Last date to fetch (numpy.datetime64, inclusive).
+    :return: A structured array with BAR_DTYPE, sorted by date.
+    """
+    import yfinance as yf
+
+    # Yahoo treats the end date as exclusive
+    frame = yf.Ticker(symbol).history(start=str(start), end=str(end + np.timedelta64(1, "D")), auto_adjust=False)
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    if len(frame):
+        bars["date"] = frame.index.tz_localize(None).values.astype("datetime64[D]")
+        bars["open"] = frame["Open"].to_numpy()
+        bars["high"] = frame["High"].to_numpy()
+        bars["low"] = frame["Low"].to_numpy()
+        bars["close"] = frame["Close"].to_numpy()
+    return bars
+
+
+class HistoryStore:
+    def __init__(self, directory="price_history", fetcher=yfinance_history):
+        """
+        Initialize an on-disk store of daily OHLC bars, one file per symbol.
+
+        Bars are kept as NumPy structured arrays and opened memory-mapped.
+        Alongside each file the store records which date ranges have already
+        been requested, so later updates only fetch the missing ranges.
+
+        :param directory: Directory holding the cached series.
+        :param fetcher: Callable fetcher(symbol, start, end) returning bars with BAR_DTYPE.
+        """
+        self.directory = directory
+        self.fetcher = fetcher
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, symbol):
+        base = os.path.join(self.directory, symbol.upper())
+        return base + ".npy", base + ".json"
+
+    def coverage(self, symbol):
+        """
+        Get the date ranges already requested for a symbol.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: A sorted list of non-overlapping (start, end) tuples of numpy.datetime64; empty if nothing is cached.
+        """
+        _, meta_path = self._paths(symbol)
+        try:
+            with open(meta_path) as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            return []
+        ranges = meta["ranges"] if "ranges" in meta else [[meta["start"], meta["end"]]]
+        return [(np.datetime64(first, "D"), np.datetime64(last, "D")) for first, last in ranges]
+
+    @staticmethod
+    def merge_ranges(ranges):
+        """
+        Merge overlapping or adjacent date ranges.
+
+        :param ranges: Iterable of (start, end) tuples of numpy.datetime64.
+        :return: A sorted list of non-overlapping (start, end) tuples.
+        """
+        one_day = np.timedelta64(1, "D")
+        merged = []
+        for first, last in sorted(ranges):
+            if merged and first <= merged[-1][1] + one_day:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else:
+                merged.append((first, last))
+        return merged
+
+    def load(self, symbol):
+        """
+        Open the cached bars for a symbol.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :return: A read-only, memory-mapped structured array (empty if nothing is cached).
+        """
+        data_path, _ = self._paths(symbol)
+        if not os.path.exists(data_path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(data_path, mmap_mode="r")
+
+    def missing_ranges(self, symbol, start, end):
+        """
+        Get the parts of a date range that have not been requested yet.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param start: First date wanted (inclusive).
+        :param end: Last date wanted (inclusive).
+        :return: A list of (start, end) tuples.
+        """
+        start = np.datetime64(start, "D")
+        end = np.datetime64(end, "D")
+        one_day = np.timedelta64(1, "D")
+        ranges = []
+        # Walk the covered ranges in order, keeping the gaps before, between and after them
+        for first, last in self.coverage(symbol):
+            if last < start:
+                continue
+            if first > end:
+                break
+            if start < first:
+                ranges.append((start, first - one_day))
+            start = last + one_day
+        if start <= end:
+            ranges.append((start, end))
+        return ranges
+
+    @staticmethod
+    def last_complete_day():
+        """
+        Get the last day whose bars can no longer change.
+
+        :return: Yesterday (UTC) as numpy.datetime64.
+        """
+        return np.datetime64("today", "D") - np.timedelta64(1, "D")
+
+    def update(self, symbol, start, end):
+        """
+        Make sure a date range is cached, fetching only what is missing.
+
+        :param symbol: Stock symbol (e.g., "AAPL").
+        :param start: First date wanted (inclusive).
+        :param end: Last date wanted (inclusive).
+        :return: Number of new bars stored.
+        """
+        ranges = self.missing_ranges(symbol, start, end)
+        if not ranges:
+            return 0
+
+        fetched = [self.fetcher(symbol, first, last) for first, last in ranges]
+        existing = np.array(self.load(symbol))  # Copy so the memory map can be replaced
+        bars = np.concatenate([existing] + fetched)
+        bars = bars[np.argsort(bars["date"], kind="stable")]
+        if len(bars):
+            # Keep the last copy of any date fetched twice
+            keep = np.append(bars["date"][1:] != bars["date"][:-1], True)
+            bars = bars[keep]
+
+        # Today's bar is not final and later days have none yet, so only earlier days count as covered
+        covered = self.coverage(symbol)
+        first, last = np.datetime64(start, "D"), min(np.datetime64(end, "D"), self.last_complete_day())
+        if first <= last:
+            covered = self.merge_ranges(covered + [(first, last)])
+
+        data_path, meta_path = self._paths(symbol)
+        np.save(data_path + ".tmp.npy", bars)
+        os.replace(data_path + ".tmp.npy", data_path)
+        with open(meta_path + ".tmp", "w") as file:
+            json.dump({"ranges": [[str(first), str(last)] for first, last in covered]}, file)
+        os.replace(meta_path + ".tmp", meta_path)
+        return len(bars) - len(existing)
+
+    def closes(self, symbols, start=None, end=None):
+        """
+        Align closing prices of several symbols on a common date axis.
+
+        Dates on which a symbol did not trade carry its previous close
+        forward; dates before its first bar are NaN.
+
+        :param symbols: List of stock symbols.
+        :param start: Optional first date (inclusive).
+        :param end: Optional last date (inclusive).
+        :return: A tuple (dates, closes) with closes shaped (len(dates), len(symbols)).
+        """
+        series = []
+        for symbol in symbols:
+            bars = self.load(symbol)
+            dates = bars["date"]
+            lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+            hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+            series.append((dates[lo:hi], bars["close"][lo:hi]))
+
+        dates = np.unique(np.concatenate([d for d, _ in series])) if series else np.empty(0, dtype="datetime64[D]")
+        closes = np.full((len(dates), len(symbols)), np.nan)
+        for column, (symbol_dates, symbol_closes) in enumerate(series):
+            closes[np.searchsorted(dates, symbol_dates), column] = symbol_closes
+
+        # Forward-fill gaps by carrying the index of the last valid row down each column
+        valid = ~np.isnan(closes)
+        last_valid = np.where(valid, np.arange(len(dates))[:, None], 0)
+        np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+        filled = closes[last_valid, np.arange(len(symbols))]
+        filled[np.cumsum(valid, axis=0) == 0] = np.nan
+        return dates, filled